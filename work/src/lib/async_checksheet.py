@@ -0,0 +1,221 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+
+import aiohttp
+
+from lib.log import LOG
+from lib.checksheet import Checksheet
+from lib.transport import Transport, TransportPolicy
+
+class AsyncChecksheet():
+    """
+    asyncioのイベントループ上で使用する技術検証機管理表のクライアントです。
+    ログインの手順はChecksheetと同じで、通信はaiohttpで行い、表の解析はイベントループを止めないようにExecutorで行います。
+    複数のインスタンスでaiohttp.TCPConnectorを共有すると、Cookieはインスタンスごとに分けたまま接続を再利用できます。
+    """
+
+    BASE_URL = "http://10.3.223.251/Checksheet"  # 技術検証機管理表
+    __LOGIN_PAGE = "login.jsp"  # ログイン画面
+    __FORM_DATA_DST = "LogIn"  # 認証情報の送信先
+    __MAIN_PAGE = "Main"  # 技術検証機管理表（管理者用ページ）
+
+    def __init__(
+            self,
+            policy: TransportPolicy | None = None,
+            connector: aiohttp.BaseConnector | None = None,
+            executor: Executor | None = None,
+            base_url: str | None = None
+            ) -> None:
+        """
+        Args:
+            policy (TransportPolicy | None): HTTP通信の設定（ヘッジリクエストは使用しません）。Noneの場合は既定値を使用します。
+            connector (aiohttp.BaseConnector | None): 共有するコネクションプール。Noneの場合はインスタンスごとに作成します。
+            executor (Executor | None): 表の解析に使用するExecutor。Noneの場合はイベントループの既定のExecutorを使用します。
+            base_url (str | None): 技術検証機管理表のURL。Noneの場合はBASE_URLを使用します。
+        """
+
+        self.__policy = policy if policy is not None else TransportPolicy()
+        self.__connector = connector
+        self.__executor = executor
+        base_url = (base_url if base_url is not None else self.BASE_URL).rstrip("/")
+        self.__login_page = f"{base_url}/{self.__LOGIN_PAGE}"
+        self.__form_data_dst = f"{base_url}/{self.__FORM_DATA_DST}"
+        self.__main_page = f"{base_url}/{self.__MAIN_PAGE}"
+        self.__checksheet = Checksheet(self.__policy)  # 管理者用ページのHTMLテキストを保持し、解析します。
+
+    async def __send(
+            self,
+            session: aiohttp.ClientSession,
+            method: str,
+            url: str,
+            attempt: str,
+            **kwargs
+            ) -> tuple[int, str, str]:
+        """
+        リクエストを1回送信して、レイテンシをログに出力します。
+
+        Args:
+            session (aiohttp.ClientSession): 使用するセッション
+            method (str): HTTPメソッド
+            url (str): 送信先URL
+            attempt (str): ログ出力用の試行の識別子
+
+        Returns:
+            tuple[int, str, str]: ステータスコード、リダイレクト後のURL、レスポンスのテキスト
+        """
+
+        started = time.monotonic()
+        try:
+            async with session.request(method, url, **kwargs) as res:
+                text = await res.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            LOG.warning(f"{method} '{url}' ({attempt}) failed after {time.monotonic() - started:.3f}s: {ex!r}")
+            raise
+        LOG.debug(f"{method} '{url}' ({attempt}) took {time.monotonic() - started:.3f}s. Status code: {res.status}")
+        LOG.debug(f"Current URL: {res.url}")
+        return res.status, str(res.url), text
+
+    async def __get(
+            self,
+            session: aiohttp.ClientSession,
+            url: str
+            ) -> tuple[int, str, str]:
+        """
+        GETリクエストを送信します。
+        接続エラー、タイムアウト、RETRY_STATUS_CODESの場合は、Transportと同じく指数バックオフでリトライします。
+
+        Args:
+            session (aiohttp.ClientSession): 使用するセッション
+            url (str): 送信先URL
+
+        Returns:
+            tuple[int, str, str]: ステータスコード、リダイレクト後のURL、レスポンスのテキスト
+        """
+
+        for retry in range(self.__policy.retries + 1):
+            attempt = f"attempt {retry + 1}/{self.__policy.retries + 1}"
+            try:
+                status, current_url, text = await self.__send(session, "GET", url, attempt)
+                if status not in Transport.RETRY_STATUS_CODES or retry == self.__policy.retries:
+                    return status, current_url, text
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if retry == self.__policy.retries:
+                    raise
+
+            delay = self.__policy.backoff * (2 ** retry)
+            LOG.warning(f"Retry GET '{url}' in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+
+    async def __login(
+            self,
+            session: aiohttp.ClientSession,
+            user_id: str,
+            password: str
+            ) -> bool:
+        """
+        ログイン画面、認証情報の送信、管理者用ページの順にアクセスします。
+
+        Args:
+            session (aiohttp.ClientSession): 使用するセッション
+            user_id (str): ユーザーID
+            password (str): パスワード
+
+        Returns:
+            bool: ログインに成功した場合はTrue、失敗した場合はFalseを返します。
+        """
+
+        # 1．ログイン画面にアクセスします。
+        status, _, _ = await self.__get(session, self.__login_page)
+        if status >= 400:
+            LOG.error(f"Failed to access '{self.__login_page}'.")
+            return False
+
+        # 2．認証情報を送信します。冪等でないためリトライはしません。
+        status, _, _ = await self.__send(session, "POST", self.__form_data_dst, "attempt 1/1",
+                                         data={"LogIn_ID": user_id, "Password": password})
+        if status >= 400:
+            LOG.error(f"Failed to send authentication info to '{self.__form_data_dst}'.")
+            return False
+
+        # 3．管理者用ページにアクセスします。認証情報が間違っていれば、技術検証機管理表にリダイレクトされます。
+        status, current_url, text = await self.__get(session, self.__main_page)
+        if status >= 400 or current_url != self.__main_page:
+            LOG.error(f"Failed to access '{self.__main_page}'.")
+            return False
+
+        self.__checksheet.set_main_page_html(text)
+        return True
+
+    async def login(
+            self,
+            user_id: str,
+            password: str
+            ) -> bool:
+        """
+        技術検証機管理表の管理者用ページへのログインを試みます。
+
+        Args:
+            user_id (str): ユーザーID
+            password (str): パスワード
+
+        Returns:
+            bool: ログインに成功した場合はTrue、失敗した場合はFalseを返します。
+        """
+
+        # Cookieはインスタンスごとのセッションに保持し、接続は共有のコネクタから借ります。
+        timeout = aiohttp.ClientTimeout(sock_connect=self.__policy.connect_timeout,
+                                        sock_read=self.__policy.read_timeout)
+        session = aiohttp.ClientSession(
+            connector=self.__connector,
+            connector_owner=self.__connector is None,
+            timeout=timeout,
+            cookie_jar=aiohttp.CookieJar(unsafe=True)  # 既定ではIPアドレスのホストのCookieを保持しません。
+            )
+        deadline = asyncio.timeout(self.__policy.deadline)
+        try:
+            async with deadline:
+                return await self.__login(session, user_id, password)
+        except TimeoutError:
+            if deadline.expired():
+                LOG.error(f"The deadline({self.__policy.deadline}s) has been exceeded.")
+            else:
+                LOG.exception("Unexpected error occurred.")  # リトライ回数を超えた読み込みタイムアウト
+            return False
+        except Exception:
+            LOG.exception("Unexpected error occurred.")
+            return False
+        finally:
+            await session.close()
+
+    @property
+    def main_page_length(
+            self
+            ) -> int:
+        """
+        管理者用ページのHTMLテキストの長さ（解析に必要なメモリの見積もりに使用します）
+        """
+
+        return self.__checksheet.main_page_length
+
+    async def fetch_asset_data(
+            self,
+            workers: int = 1,
+            incremental: bool = False
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        管理者用ページの表から資産データを取得します。
+        解析はExecutorで行うため、その間もイベントループは他の処理を実行できます。
+        表の整合性が欠けている場合はNoneを返します。
+
+        Args:
+            workers (int): 表の解析に使用するプロセス数。2以上の場合は並列に解析します。
+            incremental (bool): メモリ使用量を抑えるために逐次解析する場合はTrue（workersより優先します）
+
+        Returns:
+            dict[str, dict[str, str]] | None: 資産データ
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor, self.__checksheet.fetch_asset_data, workers, incremental)
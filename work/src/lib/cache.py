@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Iterable, Iterator
+
+from lib.log import LOG
+from lib.memory import MB
+from lib.preflight import Preflight
+
+class ResultCache():
+    """
+    棚卸リストと技術資産管理表の比較結果（差分）を、実行をまたいで保存するキャッシュです。
+    キーは、棚卸リストのファイルの内容のハッシュ、資産データのハッシュ、棚卸実施期間から作成します。
+    入力が前回と同じであれば、比較を行わずに保存済みの差分を使用できます。
+    """
+
+    VERSION = 2  # キャッシュの形式と比較処理のバージョン（比較処理を変更した場合は上げてください）
+    READ_SIZE = 1024 * 1024  # ファイルをハッシュに加える単位
+    # xlsxファイルのうち、シートの値に影響するファイル（日付のセルの値は、スタイルの表示形式で決まります）
+    __XLSX_PARTS = ["xl/sharedStrings.xml", "xl/styles.xml"]
+    __SUFFIX = ".diff.json"
+
+    def __init__(
+            self,
+            directory: str,
+            max_size_mb: float = 100,
+            max_age_days: float = 30
+            ) -> None:
+        """
+        Args:
+            directory (str): キャッシュを保存するフォルダ（無ければ作成します）
+            max_size_mb (float): キャッシュ全体の大きさの上限（MB）。超えた場合は古いものから削除します。
+            max_age_days (float): キャッシュの有効期間（日）。最後に使用してから経過したものは削除します。
+        """
+
+        self.__directory = directory
+        self.__max_size = int(max_size_mb * MB)
+        self.__max_age = max_age_days * 24 * 60 * 60
+
+    def __hash_inventory(
+            self,
+            file_path: str,
+            sheet_name: str | None
+            ) -> str | None:
+        """
+        棚卸リストのファイルの内容のハッシュを作成します。
+        xlsxファイルはopenpyxlで読み込まず、zipから対象シートのXMLと共有文字列、スタイルのバイト列をそのままハッシュに加えます。
+        CSV/TSVファイルはファイル全体のバイト列をハッシュに加えます。
+
+        Args:
+            file_path (str): 棚卸リストのファイルパス
+            sheet_name (str | None): Excelのシート名（CSV/TSVの場合は不要）
+
+        Returns:
+            str | None: ハッシュ。ファイルを読み込めない場合はNone
+        """
+
+        sheet_hash = hashlib.sha256()
+        try:
+            if os.path.splitext(file_path)[1].lower() in [".csv", ".tsv"]:
+                with open(file_path, "rb") as f:
+                    while chunk := f.read(self.READ_SIZE):
+                        sheet_hash.update(chunk)
+                return sheet_hash.hexdigest()
+
+            with zipfile.ZipFile(file_path) as archive:
+                sheet_path = Preflight(sheet_name).find_sheet_path(archive)
+                if sheet_path is None:
+                    return None
+                names = set(archive.namelist())
+                for name in [sheet_path] + self.__XLSX_PARTS:
+                    sheet_hash.update(name.encode("utf-8"))  # どのファイルのバイト列かを区別します。
+                    if name in names:
+                        with archive.open(name) as f:
+                            while chunk := f.read(self.READ_SIZE):
+                                sheet_hash.update(chunk)
+        except (OSError, KeyError, zipfile.BadZipFile, ET.ParseError):
+            LOG.warning(f"Failed to read '{file_path}' to create the cache key.")
+            return None
+        return sheet_hash.hexdigest()
+
+    def key(
+            self,
+            file_path: str,
+            sheet_name: str | None,
+            asset_data: dict[str, dict[str, str]],
+            start_date: str,
+            end_date: str
+            ) -> str | None:
+        """
+        キャッシュのキーを作成します。棚卸リストはファイルの内容を少しずつ、資産データは1行分ずつハッシュに加えるため、
+        全体を文字列にしてメモリ上に保持することはありません。
+
+        Args:
+            file_path (str): 棚卸リストのファイルパス
+            sheet_name (str | None): Excelのシート名（CSV/TSVの場合は不要）
+            asset_data (dict[str, dict[str, str]]): 技術資産管理表
+            start_date (str): 棚卸開始日
+            end_date (str): 棚卸終了日
+
+        Returns:
+            str | None: キャッシュのキー。棚卸リストを読み込めない場合はNone
+        """
+
+        sheet_hash = self.__hash_inventory(file_path, sheet_name)
+        if sheet_hash is None:
+            return None
+
+        # 資産データの並び順は比較結果に影響しないため、管理番号の順にハッシュに加えます。
+        asset_hash = hashlib.sha256()
+        for mng_no in sorted(asset_data):
+            asset_hash.update(json.dumps([mng_no, asset_data[mng_no]], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+        key = hashlib.sha256(json.dumps(
+            [self.VERSION, sheet_hash, asset_hash.hexdigest(), start_date, end_date]).encode("utf-8"))
+        return key.hexdigest()
+
+    def __path(
+            self,
+            key: str
+            ) -> str:
+        return os.path.join(self.__directory, key + self.__SUFFIX)
+
+    def get(
+            self,
+            key: str
+            ) -> list[tuple[str, dict[str, dict[str, str]]]] | None:
+        """
+        保存済みの差分を取得します。キャッシュが無い場合や読み込めない場合はNoneを返します。
+
+        Args:
+            key (str): キャッシュのキー
+
+        Returns:
+            list[tuple[str, dict[str, dict[str, str]]]] | None: 行番号と、その行の差分の組のリスト（行順）
+        """
+
+        path = self.__path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            LOG.debug(f"No cached result for {key[:16]}.")
+            return None
+        except (OSError, ValueError):
+            LOG.warning(f"Failed to read the cached result '{path}'. Ignore it.")
+            return None
+        if entry.get("version") != self.VERSION:
+            return None
+
+        try:
+            os.utime(path)  # 最後に使用した日時として更新日時を更新します。
+        except OSError:
+            pass
+        LOG.info(f"Use the cached result of the previous run ({len(entry['diff'])} differences).")
+        return [(row_num, row_diff) for row_num, row_diff in entry["diff"]]
+
+    def put(
+            self,
+            key: str,
+            diff: list[tuple[str, dict[str, dict[str, str]]]]
+            ) -> None:
+        """
+        差分を保存し、有効期間と大きさの上限に従って古いキャッシュを削除します。
+        保存に失敗しても処理は続けられるため、警告のみ出力します。
+
+        Args:
+            key (str): キャッシュのキー
+            diff (list[tuple[str, dict[str, dict[str, str]]]]): 行番号と、その行の差分の組のリスト（行順）
+        """
+
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.__directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": self.VERSION, "diff": diff}, f, ensure_ascii=False)
+                os.replace(temp_path, self.__path(key))
+            except Exception:
+                os.remove(temp_path)
+                raise
+        except OSError:
+            LOG.warning(f"Failed to write the cached result to '{self.__directory}'.")
+            return
+        LOG.debug(f"Cached the result as {key[:16]}.")
+        self.evict()
+
+    def record(
+            self,
+            key: str,
+            diff: Iterable[tuple[str, dict[str, dict[str, str]]]]
+            ) -> Iterator[tuple[str, dict[str, dict[str, str]]]]:
+        """
+        差分をそのまま次の処理に渡しながら、最後まで渡し終えたら保存します。
+        途中で中断された場合は保存しません。
+
+        Args:
+            key (str): キャッシュのキー
+            diff (Iterable[tuple[str, dict[str, dict[str, str]]]]): Excelと技術資産管理表の差分
+
+        Yields:
+            tuple[str, dict[str, dict[str, str]]]: 行番号と、その行の差分
+        """
+
+        recorded = []
+        for row_num, row_diff in diff:
+            recorded.append((row_num, row_diff))
+            yield row_num, row_diff
+        self.put(key, recorded)
+
+    def evict(
+            self
+            ) -> None:
+        """
+        有効期間を過ぎたキャッシュを削除し、残りの大きさが上限を超えている場合は最後に使用した日時が古いものから削除します。
+        """
+
+        entries = []
+        try:
+            with os.scandir(self.__directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(self.__SUFFIX):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        now = time.time()
+        entries.sort()  # 古い順
+        total_size = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if now - mtime <= self.__max_age and total_size <= self.__max_size:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+                LOG.debug(f"Evicted the cached result '{path}'.")
+            except OSError:
+                pass
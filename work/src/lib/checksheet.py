@@ -1,10 +1,87 @@
+import multiprocessing
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
 
 import bs4
+import lxml.etree
 import requests
 
 from lib.log import LOG
+from lib.transport import Transport, TransportPolicy, DeadlineExceeded
+
+def _parse_rows(
+        tr_rs: list[bs4.Tag],
+        column_names: list[str],
+        expected_length: int
+        ) -> list[tuple[str, dict[str, str]]] | None:
+    """
+    表の行（trタグ）から資産データを取得します。
+    列数の整合性が欠けている場合はNoneを返します。
+
+    Args:
+        tr_rs (list[bs4.Tag]): trタグのリスト
+        column_names (list[str]): 表の列名
+        expected_length (int): 表の列数
+
+    Returns:
+        list[tuple[str, dict[str, str]]] | None: 管理番号と資産データの組のリスト（表の行順）
+    """
+
+    rows = []
+    for tr_tag in tr_rs:
+        td_rs = tr_tag.find_all("td")
+
+        # 列数の整合性を確認します。
+        actual_length = len(td_rs)
+        if actual_length != expected_length:
+            LOG.error(f"The number of columns was expected to be '{expected_length}', "
+                      f"but it was '{actual_length}'.")
+            return None
+
+        # 各列の値を取得します。
+        mng_no = None
+        row_data = {}
+        for column_name, td_tag in zip(column_names, td_rs):
+            # 管理番号は、asset_dataのキーにします。
+            if column_name == column_names[0]:
+                # 管理番号は、1つ目のaタグのテキストノードに記載されています。
+                # 注意：「管理番号」の列名が複数ある場合、最終列の値で上書きされます。
+                mng_no = td_tag.find("a").get_text()
+            # 管理番号以外は、asset_dataの値にします。
+            else:
+                row_data[column_name] = td_tag.get_text()
+
+        if mng_no is not None:
+            rows.append((mng_no, row_data))
+        else:
+            LOG.error(f"Failed to get the management number from the folloing td tag.\n{td_tag}")
+            return None
+
+    return rows
+
+def _parse_row_chunk(
+        chunk: str,
+        column_names: list[str],
+        expected_length: int
+        ) -> list[tuple[str, dict[str, str]]] | None:
+    """
+    tbodyタグの一部（trタグの境界で分割したHTMLテキスト）から資産データを取得します。
+    プロセスプールのワーカーで実行するため、モジュールの関数にしています。
+
+    Args:
+        chunk (str): trタグの境界で分割したHTMLテキスト
+        column_names (list[str]): 表の列名
+        expected_length (int): 表の列数
+
+    Returns:
+        list[tuple[str, dict[str, str]]] | None: 管理番号と資産データの組のリスト（表の行順）
+    """
+
+    soup = bs4.BeautifulSoup(f"<table><tbody>{chunk}</tbody></table>", "lxml")
+    return _parse_rows(soup.find("tbody").find_all("tr"), column_names, expected_length)
 
 class Checksheet():
     # __ALLPRODUCTS_PAGE = "http://10.3.223.251/Checksheet/AllProducts"  # 技術検証機管理表
@@ -35,8 +112,24 @@ class Checksheet():
             "最終棚卸確認者",
             "備考、廃棄（年月)"
             ]
-    __session: requests.Session = None  # セッション
-    __main_page_html: str = None  # 管理者用ページのHTMLテキスト
+    __FEED_SIZE = 1024 * 1024  # 逐次解析でlxmlに1回で渡すHTMLテキストの長さ
+
+    def __init__(
+            self,
+            policy: TransportPolicy | None = None
+            ) -> None:
+        """
+        Args:
+            policy (TransportPolicy | None): HTTP通信の設定。Noneの場合は既定値を使用します。
+        """
+
+        self.__policy = policy if policy is not None else TransportPolicy()
+        # ログインごとの状態はインスタンスに持たせ、複数のインスタンスを別々のスレッドで同時に使用できるようにします。
+        self.__session: requests.Session | None = None  # セッション
+        self.__transport: Transport | None = None  # タイムアウトとリトライを制御するHTTP通信
+        self.__main_page_html: str | None = None  # 管理者用ページのHTMLテキスト
+        # 1つのインスタンスを複数のスレッドから使用する場合に、ログインと解析を1つずつ行います。
+        self.__lock = threading.RLock()
 
     def __access_login_page(
             self
@@ -49,7 +142,7 @@ class Checksheet():
         """
 
         LOG.debug(f"Attempt to access '{self.__LOGIN_PAGE}'.")
-        res = self.__session.get(self.__LOGIN_PAGE)
+        res = self.__transport.get(self.__LOGIN_PAGE)
         LOG.debug(f"Status code: {res.status_code}")
         LOG.debug(f"Current URL: {res.url}")
         return True if res.ok else False
@@ -60,7 +153,7 @@ class Checksheet():
             password: str
             ) -> bool:
         LOG.debug(f"Attempt to access '{self.__FORM_DATA_DST}'.")
-        res = self.__session.post(
+        res = self.__transport.post(
             url=self.__FORM_DATA_DST,  # formタグのaction属性
             data={
                 "LogIn_ID": user_id,
@@ -85,7 +178,8 @@ class Checksheet():
         # 認証情報が正しければ、技術検証機管理表（管理者用ページ）にアクセスできます。
         # 間違っていれば、技術検証機管理表にリダイレクトされます。
         LOG.debug(f"Attempt to log in to '{self.__MAIN_PAGE}'.")
-        res = self.__session.get(self.__MAIN_PAGE)
+        # 管理者用ページはダウンロードに時間がかかるため、ヘッジリクエストの対象にします。
+        res = self.__transport.get(self.__MAIN_PAGE, hedge=True)
         LOG.debug(f"Status code: {res.status_code}")
         LOG.debug(f"Current URL: {res.url}")
         
@@ -111,32 +205,37 @@ class Checksheet():
             bool: ログインに成功した場合はTrue、失敗した場合はFalseを返します。
         """
 
-        # Seleniumを使用せずに管理者用ページにアクセスするためには、
-        # セッション（requests.Session）を使用して以下の手順を踏む必要があります。
-        # 1．ログイン画面にアクセスします。
-        # 2．ログイン画面のformタグのaction属性で指定されているURLに対して、
-        # 認証情報（ユーザーIDとパスワード）を送信します。
-        # 3．管理者用ページにアクセスします。
-
-        self.__session = requests.Session()
-        try:
-            if not self.__access_login_page():
-                LOG.error(f"Failed to access '{self.__LOGIN_PAGE}'.")
-                return False
+        with self.__lock:
+            # Seleniumを使用せずに管理者用ページにアクセスするためには、
+            # セッション（requests.Session）を使用して以下の手順を踏む必要があります。
+            # 1．ログイン画面にアクセスします。
+            # 2．ログイン画面のformタグのaction属性で指定されているURLに対して、
+            # 認証情報（ユーザーIDとパスワード）を送信します。
+            # 3．管理者用ページにアクセスします。
 
-            if not self.__send_auth_info(user_id, password):
-                LOG.error(f"Failed to send authentication info to '{self.__FORM_DATA_DST}'.")
+            self.__session = requests.Session()
+            self.__transport = Transport(self.__session, self.__policy)
+            try:
+                if not self.__access_login_page():
+                    LOG.error(f"Failed to access '{self.__LOGIN_PAGE}'.")
+                    return False
+
+                if not self.__send_auth_info(user_id, password):
+                    LOG.error(f"Failed to send authentication info to '{self.__FORM_DATA_DST}'.")
+                    return False
+
+                if not self.__access_main_page():
+                    LOG.error(f"Failed to access '{self.__MAIN_PAGE}'.")
+                    return False
+            except DeadlineExceeded as ex:
+                LOG.error(str(ex))
                 return False
-
-            if not self.__access_main_page():
-                LOG.error(f"Failed to access '{self.__MAIN_PAGE}'.")
+            except Exception:
+                LOG.exception("Unexpected error occurred.")
                 return False
-        except Exception:
-            LOG.exception("Unexpected error occurred.")
-            return False
-        finally:
-            self.__session.close()
-        return True
+            finally:
+                self.__session.close()
+            return True
 
     def __are_column_names_vaild(
             self,
@@ -168,27 +267,76 @@ class Checksheet():
 
         return result
 
-    def fetch_asset_data(
-            self
+    def __split_tbody(
+            self,
+            chunks: int
+            ) -> tuple[str, list[str]] | None:
+        """
+        管理者用ページのHTMLテキストを、最初の表のtheadタグと、
+        trタグの境界で分割したtbodyタグの中身に分けます。
+        表の位置を特定できなかった場合はNoneを返します。
+
+        Args:
+            chunks (int): tbodyタグの分割数
+
+        Returns:
+            tuple[str, list[str]] | None: theadタグのHTMLテキストと、分割したtbodyタグの中身
+        """
+
+        table = re.search(r"<table[\s>]", self.__main_page_html, re.IGNORECASE)
+        if table is None:
+            return None
+        thead = re.compile(r"<thead[\s>].*?</thead>", re.IGNORECASE | re.DOTALL).search(
+            self.__main_page_html, table.start())
+        tbody = re.compile(r"<tbody[^>]*>", re.IGNORECASE).search(self.__main_page_html, table.start())
+        if thead is None or tbody is None:
+            return None
+        tbody_end = re.compile(r"</tbody>", re.IGNORECASE).search(self.__main_page_html, tbody.end())
+        if tbody_end is None:
+            return None
+
+        # tbodyタグの中身をおおよそ等分し、各分割位置を直後のtrタグの開始位置に合わせます。
+        tr_pattern = re.compile(r"<tr[\s>]", re.IGNORECASE)
+        start, end = tbody.end(), tbody_end.start()
+        bounds = [start]
+        for i in range(1, chunks):
+            tr = tr_pattern.search(self.__main_page_html, max(bounds[-1], start + (end - start) * i // chunks), end)
+            if tr is None:
+                break
+            if tr.start() > bounds[-1]:
+                bounds.append(tr.start())
+        bounds.append(end)
+
+        body = [self.__main_page_html[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+        return thead.group(), body
+
+    def __fetch_asset_data_parallel(
+            self,
+            workers: int
             ) -> dict[str, dict[str, str]] | None:
         """
-        管理者用ページの表から資産データを取得します。
+        tbodyタグをtrタグの境界で分割し、プロセスプールで並列に解析して資産データを取得します。
+        結果は表の行順にマージするため、管理番号が重複した場合の扱いは直列の場合と同じです。
         表の整合性が欠けている場合はNoneを返します。
 
+        Args:
+            workers (int): ワーカープロセス数
+
         Returns:
             dict[str, dict[str, str]] | None: 資産データ
         """
-        
-        assert self.__main_page_html != None
 
-        soup = bs4.BeautifulSoup(self.__main_page_html, "lxml")
-        table = soup.find("table")
+        split = self.__split_tbody(workers * 4)  # ワーカー間の負荷の偏りを抑えるため多めに分割します。
+        if split is None:
+            LOG.warning(f"Failed to locate the table in '{self.__MAIN_PAGE}'. Parse it serially.")
+            return self.fetch_asset_data()
+        thead, chunks = split
 
         # 表の列名を取得します。
-        th_rs = table.find("thead").find_all("th")
-        column_name_lst = [th_tag.get_text() for th_tag in th_rs]
+        soup = bs4.BeautifulSoup(f"<table>{thead}</table>", "lxml")
+        column_name_lst = [th_tag.get_text() for th_tag in soup.find("thead").find_all("th")]
         LOG.debug(f"Column names: {column_name_lst}")
-        del th_rs
+        del soup
 
         # 列名の整合性を確認します。
         if not self.__are_column_names_vaild(column_name_lst):
@@ -196,39 +344,179 @@ class Checksheet():
             return None
 
         # 表のデータを取得します。
+        # 分割した表はワーカープロセスに受け渡すため、forkで引き継ぐ利点はありません。
+        # ヘッジリクエストの後片付けやサービスのワーカーなど、他のスレッドが実行中にforkするとデッドロックする場合があるため、
+        # forkではなくforkserver（使用できない環境ではspawn）でワーカープロセスを起動します。
+        LOG.debug(f"Parse {len(chunks)} chunks of the table with {workers} processes.")
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
         asset_data = {}
-        tr_rs = table.find("tbody").find_all("tr")
-        for tr_tag in tr_rs:
-            td_rs = tr_tag.find_all("td")
-
-            # 列数の整合性を確認します。
-            expected_length = len(column_name_lst)
-            actual_length = len(td_rs)
-            if actual_length != expected_length:
-                LOG.error(f"The number of columns was expected to be '{expected_length}', "
-                          f"but it was '{actual_length}'.")
-                return None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as executor:
+            for rows in executor.map(_parse_row_chunk, chunks, repeat(self.__COLUMN_NAMES), repeat(len(column_name_lst))):
+                if rows is None:
+                    return None
+                for mng_no, row_data in rows:
+                    asset_data[mng_no] = row_data
+
+        return asset_data
+
+    def __fetch_asset_data_incremental(
+            self
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        管理者用ページのHTMLテキストを少しずつlxmlに渡し、解析済みの行を破棄しながら資産データを取得します。
+        ページ全体の木構造を作らないため、メモリ使用量はHTMLテキストと資産データ程度に抑えられます。
+        表の整合性が欠けている場合はNoneを返します。
+
+        Returns:
+            dict[str, dict[str, str]] | None: 資産データ
+        """
+
+        def get_text(element: lxml.etree._Element) -> str:
+            return "".join(element.itertext())
 
-            # 各列の値を取得します。
-            mng_no = None
-            row_data = {}
-            for column_name, td_tag in zip(self.__COLUMN_NAMES, td_rs):
-                # 管理番号は、asset_dataのキーにします。
-                if column_name == self.__COLUMN_NAMES[0]:
-                    # 管理番号は、1つ目のaタグのテキストノードに記載されています。
-                    # 注意：「管理番号」の列名が複数ある場合、最終列の値で上書きされます。
-                    mng_no = td_tag.find("a").get_text()
-                # 管理番号以外は、asset_dataの値にします。
-                else:
-                    row_data[column_name] = td_tag.get_text()
-
-            if mng_no is not None:
-                asset_data[mng_no] = row_data
+        parser = lxml.etree.HTMLPullParser(events=("start", "end"))
+        table = None  # 最初の表（tableタグ）
+        column_name_lst = None
+        has_tbody = False
+        asset_data = {}
+        # 最後にclose()して、閉じタグが省略された要素の終了イベントも処理します。
+        for offset in [*range(0, len(self.__main_page_html), self.__FEED_SIZE), None]:
+            if offset is None:
+                parser.close()
             else:
-                LOG.error(f"Failed to get the management number from the folloing td tag.\n{td_tag}")
+                parser.feed(self.__main_page_html[offset:offset + self.__FEED_SIZE])
+            for event, element in parser.read_events():
+                if event == "start":
+                    if table is None and element.tag == "table":
+                        table = element
+                    continue
+
+                if element is table:
+                    # 直列・並列の解析と同じく、列名（theadタグ）と表の値（tbodyタグ）が揃っていなければ失敗とします。
+                    if column_name_lst is None or not has_tbody:
+                        LOG.error(f"Failed to find the column names or the table body in '{self.__MAIN_PAGE}'.")
+                        return None
+                    return asset_data
+
+                parent = element.getparent()
+                if table is None or parent is None:
+                    continue
+
+                if element.tag == "thead" and parent is table and column_name_lst is None:
+                    # 表の列名を取得します。
+                    column_name_lst = [get_text(th_tag) for th_tag in element.iter("th")]
+                    LOG.debug(f"Column names: {column_name_lst}")
+
+                    # 列名の整合性を確認します。
+                    if not self.__are_column_names_vaild(column_name_lst):
+                        LOG.error(f"'{self.__MAIN_PAGE}' is not in the expected format.")
+                        return None
+
+                elif element.tag == "tbody" and parent is table:
+                    has_tbody = True
+
+                elif element.tag == "tr" and parent.tag == "tbody" and parent.getparent() is table:
+                    if column_name_lst is None:
+                        LOG.error(f"Failed to find the column names in '{self.__MAIN_PAGE}'.")
+                        return None
+
+                    # 列数の整合性を確認します。
+                    td_rs = list(element.iter("td"))
+                    expected_length = len(column_name_lst)
+                    actual_length = len(td_rs)
+                    if actual_length != expected_length:
+                        LOG.error(f"The number of columns was expected to be '{expected_length}', "
+                                  f"but it was '{actual_length}'.")
+                        return None
+
+                    # 各列の値を取得します。管理番号は、1つ目のaタグのテキストノードに記載されています。
+                    mng_no = None
+                    row_data = {}
+                    for column_name, td_tag in zip(self.__COLUMN_NAMES, td_rs):
+                        if column_name == self.__COLUMN_NAMES[0]:
+                            mng_no = get_text(td_tag.find(".//a"))
+                        else:
+                            row_data[column_name] = get_text(td_tag)
+                    asset_data[mng_no] = row_data
+
+                    # 解析済みの行を破棄します。
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+        LOG.error(f"Failed to find the table in '{self.__MAIN_PAGE}'.")
+        return None
+
+    def set_main_page_html(
+            self,
+            html: str
+            ) -> None:
+        """
+        別の方法（AsyncChecksheetなど）でダウンロードした管理者用ページのHTMLテキストを設定します。
+        設定後はlogin()と同じように、fetch_asset_data()で資産データを取得できます。
+
+        Args:
+            html (str): 管理者用ページのHTMLテキスト
+        """
+
+        with self.__lock:
+            self.__main_page_html = html
+
+    @property
+    def main_page_length(
+            self
+            ) -> int:
+        """
+        管理者用ページのHTMLテキストの長さ（解析に必要なメモリの見積もりに使用します）
+        """
+
+        assert self.__main_page_html != None
+        return len(self.__main_page_html)
+
+    def fetch_asset_data(
+            self,
+            workers: int = 1,
+            incremental: bool = False
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        管理者用ページの表から資産データを取得します。
+        表の整合性が欠けている場合はNoneを返します。
+
+        Args:
+            workers (int): 表の解析に使用するプロセス数。2以上の場合は並列に解析します。
+            incremental (bool): メモリ使用量を抑えるために逐次解析する場合はTrue（workersより優先します）
+
+        Returns:
+            dict[str, dict[str, str]] | None: 資産データ
+        """
+        
+        with self.__lock:
+            assert self.__main_page_html != None
+
+            if incremental:
+                return self.__fetch_asset_data_incremental()
+            if workers > 1:
+                return self.__fetch_asset_data_parallel(workers)
+
+            soup = bs4.BeautifulSoup(self.__main_page_html, "lxml")
+            table = soup.find("table")
+
+            # 表の列名を取得します。
+            th_rs = table.find("thead").find_all("th")
+            column_name_lst = [th_tag.get_text() for th_tag in th_rs]
+            LOG.debug(f"Column names: {column_name_lst}")
+            del th_rs
+
+            # 列名の整合性を確認します。
+            if not self.__are_column_names_vaild(column_name_lst):
+                LOG.error(f"'{self.__MAIN_PAGE}' is not in the expected format.")
                 return None
-            
-        return asset_data
+
+            # 表のデータを取得します。
+            rows = _parse_rows(table.find("tbody").find_all("tr"), self.__COLUMN_NAMES, len(column_name_lst))
+            if rows is None:
+                return None
+            return dict(rows)
     
     @staticmethod
     def extract_approval_number(
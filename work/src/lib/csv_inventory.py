@@ -0,0 +1,387 @@
+import codecs
+import csv
+import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator
+
+import openpyxl.utils
+
+from lib.log import LOG
+from lib.inventory import InventorySource
+
+class CsvInventory(InventorySource):
+    """
+    CSV/TSV形式の棚卸リストです。Excelの棚卸リストと同じレイアウト（2行目が列名、3行目から表の値）を想定します。
+    ファイル全体をメモリ上に読み込まず、csvモジュールで1行ずつ読み書きします。
+    CSVには書式が無いため、更新したセルは赤字にする代わりに、「変更」列に列名を記載します。
+    「変更」列は、列名の行に既にあればその列を使用し、無ければ列名の行の最後の列の右隣に追加します（既存の列は上書きしません）。
+    """
+
+    CHANGE_COLUMN_NAME = "変更"  # 更新した列名を記載する列の列名
+    CHANGE_SEPARATOR = "、"  # 「変更」列で列名を区切る文字
+
+    def __init__(
+            self,
+            encoding: str = "utf-8-sig"
+            ) -> None:
+        """
+        Args:
+            encoding (str): ファイルの文字コード
+        """
+
+        super().__init__()
+        self.__encoding = encoding
+        self.__file_path: str = None
+        self.__delimiter: str = None
+        self.__read_only = False
+        self.__changes: dict[int, dict[str, dict[str, str]]] = {}  # 行番号: 差分
+        self.__column_indexes = {  # 列名: 0始まりの列番号
+            column_name: openpyxl.utils.column_index_from_string(column_letter) - 1
+            for column_letter, column_name in self.COLUMN_NAMES.items()
+        }
+        self.__lock = threading.RLock()  # 保持している差分の読み書きを1つずつ行います（同じスレッドからは再入できます）。
+
+    def __open(
+            self
+            ) -> Iterator[list[str]]:
+        """
+        棚卸リストを先頭から1行ずつ読み込みます。
+
+        Yields:
+            list[str]: 1行分の値
+        """
+
+        with open(self.__file_path, encoding=self.__encoding, newline="") as f:
+            yield from csv.reader(f, delimiter=self.__delimiter)
+
+    def __detect_format(
+            self
+            ) -> tuple[str, str]:
+        """
+        元のファイルの改行コードとBOMの有無を取得します。保存時に合わせることで、更新したセル以外は元のファイルと同じになります。
+
+        Returns:
+            tuple[str, str]: 書き込みに使用する文字コード（utf-8-sigの場合はBOMの有無に合わせます）と改行コード
+        """
+
+        encoding = self.__encoding
+        if codecs.lookup(encoding).name == "utf-8-sig":
+            with open(self.__file_path, "rb") as f:
+                has_bom = f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8
+            encoding = "utf-8-sig" if has_bom else "utf-8"
+
+        with open(self.__file_path, encoding=self.__encoding, newline="") as f:
+            first_line = f.readline()
+        for lineterminator in ["\r\n", "\n", "\r"]:
+            if first_line.endswith(lineterminator):
+                return encoding, lineterminator
+        return encoding, "\r\n"  # 1行しか無く改行が無い場合は、csvモジュールの既定値とします。
+
+    def load(
+            self,
+            file_path: str,
+            sheet_name: str,
+            read_only: bool = False
+            ) -> bool:
+        """
+        CSV/TSVファイルを読み込みます。区切り文字は拡張子（.csv/.tsv）で決まります。
+        CSV/TSVにはシートが無いため、sheet_nameは使用しません。
+
+        Args:
+            file_path (str): ファイルパス
+            sheet_name (str): 使用しません
+            read_only (bool): 更新しない場合はTrue
+
+        Returns:
+            bool: 読み込みに成功したらTrue、失敗したらFalse
+        """
+
+        with self.__lock:
+            self.__file_path = file_path
+            self.__delimiter = "\t" if os.path.splitext(file_path)[1].lower() == ".tsv" else ","
+            self.__read_only = read_only
+            self.__changes = {}
+            if not os.path.isfile(file_path):
+                LOG.error(f"'{file_path}' doesn't exist.")
+                return False
+            return True
+
+    def __are_column_names_valid(
+            self,
+            values: list[str]
+            ) -> bool:
+        """
+        列名のバリデーションチェックを行います。
+
+        Args:
+            values (list[str]): 列名の行の値
+
+        Returns:
+            bool: 一致していればTrue、一致していなければFalse
+        """
+
+        result = True
+        for column_letter, expected_value in self.COLUMN_NAMES.items():
+            index = self.__column_indexes[expected_value]
+            actual_value = values[index] if index < len(values) else None
+            if actual_value != expected_value:
+                LOG.error(f"The {column_letter}{self.COLUMN_NAME_ROW} value was expected to be '{expected_value}', "
+                          f"but it was '{actual_value}'.")
+                result = False
+
+        return result
+
+    def is_worksheet_vaild(
+            self
+            ) -> bool:
+        """
+        列名と表の最終行を確認します。
+        Excelと同じく、ステータス列の値が想定外になる直前の行を表の最終行とします。
+        CSVでは表の後ろに行が無いことが多いため、ファイルの末尾も表の終わりとして扱います。
+
+        Returns:
+            bool: 整合性がある場合はTrue、無い場合はFalseを返します。
+        """
+
+        with self.__lock:
+            last_row = -1
+            try:
+                for row_num, values in enumerate(self.__open(), start=1):
+                    if row_num == self.COLUMN_NAME_ROW:
+                        if not self.__are_column_names_valid(values):
+                            return False
+                    elif row_num >= self.START_LOW:
+                        status = values[0] if len(values) > 0 else None
+                        if not status in self.STATUS_VALUES:
+                            break
+                        last_row = row_num
+            except (OSError, UnicodeDecodeError, csv.Error):
+                LOG.exception(f"Failed to read '{self.__file_path}'.")
+                return False
+
+            if last_row != -1:
+                self.LAST_LOW = last_row
+                return True
+            else:
+                LOG.error("Failed to find last row of the table from the worksheet.")
+                return False
+
+    def are_rows_valid(
+            self,
+            row_nums: Iterable[int]
+            ) -> bool:
+        """
+        列名と、指定した行のステータス列だけを確認します。
+        索引（lib.index.RowIndex）が最新であれば行の並びは変わっていないため、表の最終行を探さずに済みます。
+        ファイルは、指定した行のうち最後の行まで読み込みます。
+
+        Args:
+            row_nums (Iterable[int]): 確認する行番号
+
+        Returns:
+            bool: 整合性がある場合はTrue、無い場合はFalseを返します。
+        """
+
+        with self.__lock:
+            targets = set(row_nums)
+            last_row = max(targets | {self.COLUMN_NAME_ROW})
+            statuses = {}
+            column_names = []  # 列名の行が無い場合は、空の行として確認します。
+            try:
+                for row_num, values in enumerate(self.__open(), start=1):
+                    if row_num > last_row:
+                        break
+                    if row_num == self.COLUMN_NAME_ROW:
+                        column_names = values
+                    elif row_num in targets:
+                        statuses[row_num] = values[0] if len(values) > 0 else None
+            except (OSError, UnicodeDecodeError, csv.Error):
+                LOG.exception(f"Failed to read '{self.__file_path}'.")
+                return False
+
+            if not self.__are_column_names_valid(column_names):
+                return False
+            for row_num in sorted(targets):
+                value = statuses.get(row_num) if row_num >= self.START_LOW else None
+                if not value in self.STATUS_VALUES:
+                    LOG.error(f"The A{row_num} value was expected to be one of {self.STATUS_VALUES}, "
+                              f"but it was '{value}'.")
+                    return False
+            return True
+
+    def iter_inventory_data(
+            self,
+            row_nums: Iterable[int] | None = None
+            ) -> Iterator[tuple[str, dict[str, str]]]:
+        """
+        棚卸リストを1行ずつ取得します。
+        メモリ上に保持するのは1行分の表データのみです。
+
+        Args:
+            row_nums (Iterable[int] | None): 取得する行番号。Noneの場合は表の全行を取得します。
+
+        Yields:
+            tuple[str, dict[str, str]]: 行番号と、その行の表データ
+        """
+
+        targets = None if row_nums is None else set(row_nums)
+        last_row = self.LAST_LOW if targets is None else max(targets, default=0)
+        for row_num, values in enumerate(self.__open(), start=1):
+            if row_num > last_row:
+                break
+            if row_num < self.START_LOW or (targets is not None and row_num not in targets):
+                continue
+            row_data = {}
+            for column_name, index in self.__column_indexes.items():
+                row_data[column_name] = values[index] if index < len(values) else ""
+            yield str(row_num), row_data
+
+    def update(
+            self,
+            diff: dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]],
+            audit_sheet: str | None = None
+            ) -> bool:
+        """
+        diffの内容を保持します。ファイルへの反映はsave()で行います。
+
+        Args:
+            diff (dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]]): 棚卸リストと技術資産管理表の差分
+            audit_sheet (str | None): CSV/TSVにはシートが無いため、使用しません（指定した場合は警告を出力します）。
+
+        Returns:
+            bool: すべての差分を反映できた場合はTrue、反映できない差分があった場合はFalse
+        """
+
+        with self.__lock:
+            if self.__file_path is None:
+                LOG.error("CSV file is not loaded.")
+                return False
+            if self.__read_only:
+                LOG.error("CSV file is loaded in read-only mode.")
+                return False
+
+            if audit_sheet is not None:
+                LOG.warning("CSV file has no sheets. The audit sheet is not recorded.")
+            if isinstance(diff, dict):
+                diff = diff.items()
+
+            has_error = False
+            updated_rows = 0
+            for row_num, changes in diff:
+                updated_rows += 1
+                for column_name, change in changes.items():
+                    if column_name not in self.__column_indexes:
+                        LOG.error(f"Column name '{column_name}' not found in COLUMN_NAMES.")
+                        has_error = True
+                        continue
+                    self.__changes.setdefault(int(row_num), {})[column_name] = change
+
+            LOG.info(f"There are {updated_rows} differences between worksheet and asset data.")
+            if has_error:
+                LOG.error("CSV file has not been updated.")
+                self.__changes = {}
+                return False
+            return True
+
+    def save(
+            self,
+            file_path: str
+            ) -> None:
+        """
+        読み込んだCSV/TSVファイルを1行ずつ書き出しながら差分を反映し、file_pathに保存します。
+        一時ファイルに書き出してから置き換えるため、途中で失敗しても元のファイルは壊れません。
+        改行コードとBOMの有無は元のファイルに合わせます。
+
+        Args:
+            file_path (str): 保存先のファイルパス
+        """
+
+        with self.__lock:
+            encoding, lineterminator = self.__detect_format()
+            directory = os.path.dirname(os.path.abspath(file_path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+                    writer = csv.writer(f, delimiter=self.__delimiter, lineterminator=lineterminator)
+                    change_index = None  # 列名の行で決まります（表の値は列名の行より後ろにあります）。
+                    for row_num, values in enumerate(self.__open(), start=1):
+                        if row_num == self.COLUMN_NAME_ROW:
+                            change_index = self.__find_change_index(values)
+                            values = self.__set_value(values, change_index, self.CHANGE_COLUMN_NAME)
+                        elif row_num in self.__changes:
+                            values = self.__apply(values, self.__changes[row_num], change_index)
+                        writer.writerow(values)
+                # mkstemp()は所有者のみ読み書きできる権限で作成するため、元のファイルの権限に合わせます。
+                shutil.copymode(self.__file_path, temp_path)
+                os.replace(temp_path, file_path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+            self.__changes = {}
+            LOG.info(f"CSV file has been updated as '{file_path}'.")
+
+    def __find_change_index(
+            self,
+            values: list[str]
+            ) -> int:
+        """
+        列名の行から「変更」列の列番号を取得します。
+        「変更」列が無い場合は、値が入っている最後の列の右隣（表の列より右）とします。
+
+        Args:
+            values (list[str]): 列名の行の値
+
+        Returns:
+            int: 0始まりの列番号
+        """
+
+        table_end = max(self.__column_indexes.values()) + 1
+        for index in range(table_end, len(values)):
+            if values[index] == self.CHANGE_COLUMN_NAME:
+                return index
+        used = [index for index, value in enumerate(values) if value != ""]
+        return max(used + [table_end - 1]) + 1
+
+    def __set_value(
+            self,
+            values: list[str],
+            index: int,
+            value: str
+            ) -> list[str]:
+        if len(values) <= index:
+            values = values + [""] * (index + 1 - len(values))
+        values[index] = value
+        return values
+
+    def __apply(
+            self,
+            values: list[str],
+            changes: dict[str, dict[str, str]],
+            change_index: int
+            ) -> list[str]:
+        """
+        1行分の差分を反映し、「変更」列に更新した列名を追記します（棚卸結果を除く）。
+
+        Args:
+            values (list[str]): 1行分の値
+            changes (dict[str, dict[str, str]]): 1行分の差分
+            change_index (int): 「変更」列の0始まりの列番号
+
+        Returns:
+            list[str]: 差分を反映した1行分の値
+        """
+
+        changed = []
+        for column_name, change in changes.items():
+            values = self.__set_value(values, self.__column_indexes[column_name], change["After"])
+            if column_name != "棚卸結果":
+                changed.append(column_name)
+
+        if len(changed) != 0:
+            flags = values[change_index] if change_index < len(values) else ""
+            flags = [flag for flag in flags.split(self.CHANGE_SEPARATOR) if flag != ""]
+            flags += [column_name for column_name in changed if column_name not in flags]
+            values = self.__set_value(values, change_index, self.CHANGE_SEPARATOR.join(flags))
+        return values
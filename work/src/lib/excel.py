@@ -1,67 +1,76 @@
+import itertools
+import threading
+from collections.abc import Iterable, Iterator
+
 import openpyxl
 import openpyxl.styles
+import openpyxl.utils
 
 from lib.log import LOG
+from lib.inventory import InventorySource
 
-class Excel():
-    WORKBOOK: openpyxl.workbook.Workbook = None
-    WORKSHEET: openpyxl.worksheet.worksheet.Worksheet = None    
-    COLUMN_NAMES = {  # 列: 値
-        "A": "ステータス",
-        "B": "棚卸結果",
-        "C": "備考",
-        "D": "備考（前回以前）",
-        "E": "管理部門",
-        "F": "管理番号",
-        "G": "シリアル（参考）",
-        "H": "稟議番号",
-        "I": "管理者",
-        "J": "使用場所",
-        "K": "使用者"
+class Excel(InventorySource):
+    COLUMN_NUMBERS = {  # 値: 列番号（1始まり）
+        column_name: openpyxl.utils.column_index_from_string(column_letter)
+        for column_letter, column_name in InventorySource.COLUMN_NAMES.items()
     }
-    COLUMN_NAME_ROW = 2  # 2行目
-    START_LOW = 3  # 表の値は3行目から
-    LAST_LOW: int = None
+    HIGHLIGHT_FONT = openpyxl.styles.Font(color="FF0000")  # 更新したセルのフォント（全セルで共有します）
+    AUDIT_COLUMN_NAMES = ["行番号", "セル", "列名", "Before", "After"]  # 変更前後の値を記録するシートの列名
+    READ_BATCH_SIZE = 1000  # iter_inventory_data()でロックを取得している間に読み込む行数
+
+    def __init__(
+            self
+            ) -> None:
+        super().__init__()
+        self.WORKBOOK: openpyxl.workbook.Workbook | None = None
+        self.WORKSHEET: openpyxl.worksheet.worksheet.Worksheet | None = None
+        # openpyxlのワークブックはスレッドセーフではないため、操作はこのロックで1つずつ行います。
+        # 同じスレッドからは再入できます（例：iter_inventory_data()を消費しながらupdate()を呼び出す場合）。
+        self.__lock = threading.RLock()
 
     def load(
             self,
             file_path: str,
-            sheet_name: str
+            sheet_name: str,
+            read_only: bool = False
             ) -> bool:
         """
         Excelファイルを読み込みます。
+        読み取り専用で読み込んだ場合は、overwrite()でファイルを更新できません。
 
         Args:
             file_path (str): ファイルパス
             sheet_name (str): 自動入力するシートの名前
+            read_only (bool): 読み取り専用（行単位のストリーミング読み込み）で読み込む場合はTrue
 
         Returns:
             bool: Excelファイルの読み込みに成功したらTrue、失敗したらFalse
         """
 
-        # Excelファイルを開いて対象のシートを読み込みます。
-        try:
-            self.WORKBOOK = openpyxl.load_workbook(file_path)
-            LOG.debug(f"Worksheets: {self.WORKBOOK.sheetnames}")
+        with self.__lock:
+            # Excelファイルを開いて対象のシートを読み込みます。
+            try:
+                self.WORKBOOK = openpyxl.load_workbook(file_path, read_only=read_only)
+                LOG.debug(f"Worksheets: {self.WORKBOOK.sheetnames}")
 
-            if sheet_name in self.WORKBOOK.sheetnames:
-                self.WORKSHEET = self.WORKBOOK[sheet_name]
-                # 後で上書きするためにWORKBOOKをここでクローズしない
-                return True
-            else:
-                LOG.error(f"The '{sheet_name}' sheet doesn't exist.")
-                self.WORKBOOK.close()
+                if sheet_name in self.WORKBOOK.sheetnames:
+                    self.WORKSHEET = self.WORKBOOK[sheet_name]
+                    # 後で上書きするためにWORKBOOKをここでクローズしない
+                    return True
+                else:
+                    LOG.error(f"The '{sheet_name}' sheet doesn't exist.")
+                    self.WORKBOOK.close()
+                    return False
+            except FileNotFoundError:
+                LOG.error(f"'{file_path}' doesn't exist.")
+                return False
+            except Exception:
+                LOG.exception("Unexpected error occurred.")
+                try:
+                    self.WORKBOOK.close()
+                except:
+                    pass
                 return False
-        except FileNotFoundError:
-            LOG.error(f"'{file_path}' doesn't exist.")
-            return False
-        except Exception:
-            LOG.exception("Unexpected error occurred.")
-            try:
-                self.WORKBOOK.close()
-            except:
-                pass
-            return False
 
     def __are_column_names_valid(
             self
@@ -97,10 +106,11 @@ class Excel():
 
         # ステータス列の値は、'棚卸対象'または'対象外'のどちらかの値が入る想定です。
         # 3行目から何行目まで値が入っているかを確認して、表の最終行を見つけます。
+        # 読み取り専用の場合もセルを1つずつ読み直さないように、A列を先頭から順に走査します。
         last_row = -1
-        for row_num in range(self.START_LOW, self.WORKSHEET.max_row + 1):
-            cell = f"A{row_num}"
-            if not self.WORKSHEET[cell].value in ["棚卸対象", "対象外"]:
+        rows = self.WORKSHEET.iter_rows(min_row=self.START_LOW, max_col=1, values_only=True)
+        for row_num, (value,) in enumerate(rows, start=self.START_LOW):
+            if not value in self.STATUS_VALUES:
                 return last_row
             last_row = row_num
 
@@ -116,85 +126,194 @@ class Excel():
             bool: 整合性がある場合はTrue、無い場合はFalseを返します。
         """
 
-        if not self.__are_column_names_valid():
-            return False
+        with self.__lock:
+            if not self.__are_column_names_valid():
+                return False
         
-        last_low = self.__find_last_row()
-        if last_low != -1:
-            self.LAST_LOW = last_low
+            last_low = self.__find_last_row()
+            if last_low != -1:
+                self.LAST_LOW = last_low
+                return True
+            else:
+                LOG.error("Failed to find last row of the table from the worksheet.")
+                return False
+
+    def are_rows_valid(
+            self,
+            row_nums: Iterable[int]
+            ) -> bool:
+        """
+        列名と、指定した行のステータス列だけを確認します。
+        索引（lib.index.RowIndex）が最新であれば行の並びは変わっていないため、表全体を走査せずに済みます。
+
+        Args:
+            row_nums (Iterable[int]): 確認する行番号
+
+        Returns:
+            bool: 整合性がある場合はTrue、無い場合はFalseを返します。
+        """
+
+        with self.__lock:
+            if not self.__are_column_names_valid():
+                return False
+
+            for row_num in row_nums:
+                value = self.WORKSHEET.cell(row=row_num, column=1).value if row_num >= self.START_LOW else None
+                if not value in self.STATUS_VALUES:
+                    LOG.error(f"The A{row_num} value was expected to be one of {self.STATUS_VALUES}, "
+                              f"but it was '{value}'.")
+                    return False
             return True
-        else:
-            LOG.error("Failed to find last row of the table from the worksheet.")
-            return False
 
-    def load_inventory_data(
-            self
-            ) -> dict[str, dict[str, str]]:
+    def iter_inventory_data(
+            self,
+            row_nums: Iterable[int] | None = None
+            ) -> Iterator[tuple[str, dict[str, str]]]:
+        """
+        棚卸リストを1行ずつ取得します。
+        READ_BATCH_SIZE行ずつロックを取得して読み込み、ロックを解放してから1行ずつ返します。
+        呼び出し側が途中で処理を止めても、他のスレッドからのワークブックの操作を待たせ続けることはありません。
+        メモリ上に保持するのはREAD_BATCH_SIZE行分の表データのみです（ワークブック自体を除く）。
+
+        Args:
+            row_nums (Iterable[int] | None): 取得する行番号。Noneの場合は表の全行を取得します。
+
+        Yields:
+            tuple[str, dict[str, str]]: 行番号と、その行の表データ
         """
-        棚卸リストを取得します。
+
+        with self.__lock:
+            column_indexes = {
+                column_name: openpyxl.utils.column_index_from_string(column_letter) - 1
+                for column_letter, column_name in self.COLUMN_NAMES.items()
+            }
+            max_col = max(column_indexes.values()) + 1
+
+            if row_nums is None:
+                rows = enumerate(self.WORKSHEET.iter_rows(
+                    min_row=self.START_LOW,
+                    max_row=self.LAST_LOW,
+                    max_col=max_col,
+                    values_only=True
+                    ), start=self.START_LOW)
+            else:
+                rows = ((row_num, next(self.WORKSHEET.iter_rows(
+                    min_row=row_num,
+                    max_row=row_num,
+                    max_col=max_col,
+                    values_only=True
+                    ))) for row_num in row_nums)
+
+        while True:
+            batch = []
+            with self.__lock:
+                for row_num, values in itertools.islice(rows, self.READ_BATCH_SIZE):
+                    row_data = {}
+                    for column_name, index in column_indexes.items():
+                        value = values[index]
+                        if value == None:
+                            value = ""  # 技術資産管理表の空値に合わせます。
+                        row_data[column_name] = str(value)  # str型でない場合があるためstr型にキャストします。
+                    batch.append((str(row_num), row_data))
+            if len(batch) == 0:
+                return
+            yield from batch
+
+    def update(
+            self,
+            diff: dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]],
+            audit_sheet: str | None = None
+            ) -> bool:
+        """
+        ワークシートをdiffの内容で更新し、更新されたセルのフォントを赤色にします。ファイルは保存しません。
+        diffにはイテレータも指定でき、1行分ずつ消費しながらセルを更新します。
+        セルは行番号と列番号で直接参照し、行順・列順に更新します（イテレータの差分は行順である前提です）。
+
+        Args:
+            diff (dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]]): Excelと技術資産管理表の差分
+            audit_sheet (str | None): 変更前後の値を記録するシートの名前。同名のシートがあれば作り直します。
+                Noneの場合は記録しません。
 
         Returns:
-            dict[str, dict[str, str]]: 棚卸リストの表データ
-        
-        Raises:
-            Exception: 想定外のエラー
-        """
-
-        inventory_data = {}
-        try:
-            for row_num in range(self.START_LOW, self.LAST_LOW + 1):
-                row_data = {}
-                for column_letter, column_name in self.COLUMN_NAMES.items():
-                    value = self.WORKSHEET[column_letter + str(row_num)].value
-                    if value == None:
-                        value = ""  # 技術資産管理表の空値に合わせます。
-                    row_data[column_name] = str(value)  # str型でない場合があるためstr型にキャストします。
-                inventory_data[str(row_num)] = row_data
-        except Exception as ex:
-            raise ex
-
-        return inventory_data
-
-    def overwrite(
+            bool: すべての差分を反映できた場合はTrue、反映できない差分があった場合はFalse
+        """
+
+        with self.__lock:
+            if self.WORKBOOK is None or self.WORKSHEET is None:
+                LOG.error("Workbook or worksheet is not loaded.")
+                return False
+            if self.WORKBOOK.read_only:
+                LOG.error("Workbook is loaded in read-only mode.")
+                return False
+
+            audit = None
+            if audit_sheet is not None:
+                if audit_sheet == self.WORKSHEET.title:
+                    LOG.error(f"The audit sheet must be different from the '{audit_sheet}' sheet.")
+                    return False
+                if audit_sheet in self.WORKBOOK.sheetnames:
+                    del self.WORKBOOK[audit_sheet]
+                audit = self.WORKBOOK.create_sheet(audit_sheet)
+                audit.append(self.AUDIT_COLUMN_NAMES)
+
+            if isinstance(diff, dict):
+                diff = sorted(diff.items(), key=lambda item: int(item[0]))
+
+            has_error = False
+            updated_rows = 0
+            for row_num, changes in diff:
+                updated_rows += 1
+                row = int(row_num)
+
+                # COLUMN_NUMBERSから列番号を取得し、列順に並べます。
+                cells = []
+                for column_name, change in changes.items():
+                    column = self.COLUMN_NUMBERS.get(column_name)
+                    if column is None:
+                        LOG.error(f"Column name '{column_name}' not found in COLUMN_NAMES.")
+                        has_error = True
+                        continue
+                    cells.append((column, column_name, change))
+                cells.sort(key=lambda item: item[0])
+
+                for column, column_name, change in cells:
+                    # セルの値を更新
+                    cell = self.WORKSHEET.cell(row=row, column=column)
+                    cell.value = change["After"]
+                    if column_name != "棚卸結果":
+                        # フォントの色を赤に設定
+                        cell.font = self.HIGHLIGHT_FONT
+                    if audit is not None:
+                        audit.append([row, cell.coordinate, column_name, change.get("Before", ""), change["After"]])
+
+            LOG.info(f"There are {updated_rows} differences between worksheet and asset data.")
+            if has_error:
+                LOG.error("Excel file has not been updated.")
+                return False
+            return True
+
+    def save(
             self,
-            diff: dict[str, dict[str, str]],
             file_path: str
             ) -> None:
         """
-        Excelファイルをdiffの内容で上書きし、更新されたセルのフォントを赤色にします。
+        Excelファイルを保存します。
 
         Args:
-            diff (dict[str, dict[str, str]]): Excelと技術資産管理表の差分
-            output_dir (str): 出力先フォルダパス
-        """
-
-        if self.WORKBOOK is None or self.WORKSHEET is None:
-            LOG.error("Workbook or worksheet is not loaded.")
-            return
-
-        has_error = False
-        for row_num, changes in diff.items():
-            for column_name, change in changes.items():
-                # COLUMN_NAMESから列の文字を取得
-                column_letter = next((k for k, v in self.COLUMN_NAMES.items() if v == column_name), None)
-                if column_letter is None:
-                    LOG.error(f"Column name '{column_name}' not found in COLUMN_NAMES.")
-                    has_error = True
-                    continue
-
-                # セルのアドレスを作成
-                cell_address = f"{column_letter}{row_num}"
-                # セルの値を更新
-                self.WORKSHEET[cell_address].value = change["After"]
-                if column_name != "棚卸結果":
-                    # フォントの色を赤に設定
-                    self.WORKSHEET[cell_address].font = openpyxl.styles.Font(color="FF0000")
-
-        if has_error:
-            LOG.error("Excel file has not been updated.")
-            return
-        
-        # 変更を保存
-        self.WORKBOOK.save(file_path)
-        LOG.info(f"Excel file has been updated as '{file_path}'.")
-        
\ No newline at end of file
+            file_path (str): 保存先のファイルパス
+        """
+
+        with self.__lock:
+            self.WORKBOOK.save(file_path)
+            LOG.info(f"Excel file has been updated as '{file_path}'.")
+
+    def close(
+            self
+            ) -> None:
+        """
+        ワークブックを閉じてリソースを解放します。
+        """
+
+        with self.__lock:
+            if self.WORKBOOK is not None:
+                self.WORKBOOK.close()
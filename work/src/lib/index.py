@@ -0,0 +1,110 @@
+import json
+import os
+
+from lib.log import LOG
+from lib.inventory import InventorySource
+
+class RowIndex():
+    """
+    棚卸リストの管理番号からワークシートの行番号を引くための索引です。
+    Excelファイルと同じフォルダに保存し、Excelファイルが更新されていれば作り直します。
+    """
+
+    VERSION = 1  # 索引ファイルの形式のバージョン
+
+    def __init__(
+            self,
+            file_path: str,
+            sheet_name: str | None
+            ) -> None:
+        """
+        Args:
+            file_path (str): Excelファイルのファイルパス
+            sheet_name (str | None): Excelのシート名（CSV/TSVの場合はNone）
+        """
+
+        self.__file_path = file_path
+        self.__sheet_name = sheet_name
+        directory, file_name = os.path.split(os.path.abspath(file_path))
+        suffix = "" if sheet_name is None else f".{sheet_name}"
+        self.__index_path = os.path.join(directory, f".{file_name}{suffix}.index.json")
+
+    def __stamp(
+            self
+            ) -> dict[str, int]:
+        """
+        Excelファイルが更新されたかを判定するための情報（更新日時とサイズ）を取得します。
+
+        Returns:
+            dict[str, int]: 更新日時（ナノ秒）とサイズ
+        """
+
+        stat = os.stat(self.__file_path)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def load(
+            self
+            ) -> dict[str, list[int]] | None:
+        """
+        保存済みの索引を読み込みます。
+        索引が無い場合や、索引の作成後にExcelファイルが更新されている場合はNoneを返します。
+
+        Returns:
+            dict[str, list[int]] | None: 管理番号と行番号のリストの対応
+        """
+
+        try:
+            with open(self.__index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            LOG.warning(f"Failed to read the index '{self.__index_path}'. Rebuild it.")
+            return None
+
+        if index.get("version") != self.VERSION or index.get("stamp") != self.__stamp():
+            LOG.debug(f"The index '{self.__index_path}' is out of date.")
+            return None
+        return index["rows"]
+
+    def build(
+            self,
+            excel: InventorySource
+            ) -> dict[str, list[int]]:
+        """
+        読み込み済みのワークシートから索引を作成して保存します。
+        同じ管理番号が複数の行にある場合は、すべての行番号を保持します。
+
+        Args:
+            excel (InventorySource): 整合性を確認済みの棚卸リスト
+
+        Returns:
+            dict[str, list[int]]: 管理番号と行番号のリストの対応
+        """
+
+        rows = {}
+        for row_num, row_data in excel.iter_inventory_data():
+            mng_no = row_data["管理番号"]
+            if mng_no != "":
+                rows.setdefault(mng_no, []).append(int(row_num))
+        self.save(rows)
+        LOG.info(f"Built the index of {len(rows)} management numbers.")
+        return rows
+
+    def save(
+            self,
+            rows: dict[str, list[int]]
+            ) -> None:
+        """
+        索引を保存します。Excelファイルを更新した後に呼び出すと、索引を最新の状態として扱います。
+
+        Args:
+            rows (dict[str, list[int]]): 管理番号と行番号のリストの対応
+        """
+
+        index = {"version": self.VERSION, "stamp": self.__stamp(), "rows": rows}
+        try:
+            with open(self.__index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+        except OSError:
+            LOG.warning(f"Failed to write the index '{self.__index_path}'.")
@@ -0,0 +1,162 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+
+class InventorySource(ABC):
+    """
+    棚卸リストの読み書きの共通インターフェースです。
+    Excel（lib.excel.Excel）とCSV/TSV（lib.csv_inventory.CsvInventory）で実装します。
+    1つのインスタンスを複数のスレッドから使用しても、メソッドの呼び出しは1つずつ実行されます。
+    """
+
+    COLUMN_NAMES = {  # 列: 値
+        "A": "ステータス",
+        "B": "棚卸結果",
+        "C": "備考",
+        "D": "備考（前回以前）",
+        "E": "管理部門",
+        "F": "管理番号",
+        "G": "シリアル（参考）",
+        "H": "稟議番号",
+        "I": "管理者",
+        "J": "使用場所",
+        "K": "使用者"
+    }
+    COLUMN_LETTERS = {v: k for k, v in COLUMN_NAMES.items()}  # 値: 列
+    COLUMN_NAME_ROW = 2  # 2行目
+    START_LOW = 3  # 表の値は3行目から
+    STATUS_VALUES = ["棚卸対象", "対象外"]  # ステータス列の値（表の最終行の判定に使用します）
+
+    def __init__(
+            self
+            ) -> None:
+        # 読み込んだファイルごとの状態はインスタンスに持たせます（クラス属性にすると他のインスタンスと共有されます）。
+        self.LAST_LOW: int | None = None  # 表の最終行
+
+    @abstractmethod
+    def load(
+            self,
+            file_path: str,
+            sheet_name: str,
+            read_only: bool = False
+            ) -> bool:
+        """
+        棚卸リストを読み込みます。
+
+        Args:
+            file_path (str): ファイルパス
+            sheet_name (str): 自動入力するシートの名前
+            read_only (bool): 更新しない場合はTrue
+
+        Returns:
+            bool: 読み込みに成功したらTrue、失敗したらFalse
+        """
+
+    @abstractmethod
+    def is_worksheet_vaild(
+            self
+            ) -> bool:
+        """
+        列名と表の最終行を確認します。
+
+        Returns:
+            bool: 整合性がある場合はTrue、無い場合はFalseを返します。
+        """
+
+    @abstractmethod
+    def are_rows_valid(
+            self,
+            row_nums: Iterable[int]
+            ) -> bool:
+        """
+        列名と、指定した行のステータス列だけを確認します。
+        索引（lib.index.RowIndex）が最新であれば行の並びは変わっていないため、表全体を走査せずに済みます。
+
+        Args:
+            row_nums (Iterable[int]): 確認する行番号
+
+        Returns:
+            bool: 整合性がある場合はTrue、無い場合はFalseを返します。
+        """
+
+    @abstractmethod
+    def iter_inventory_data(
+            self,
+            row_nums: Iterable[int] | None = None
+            ) -> Iterator[tuple[str, dict[str, str]]]:
+        """
+        棚卸リストを1行ずつ取得します。
+
+        Args:
+            row_nums (Iterable[int] | None): 取得する行番号。Noneの場合は表の全行を取得します。
+
+        Yields:
+            tuple[str, dict[str, str]]: 行番号と、その行の表データ
+        """
+
+    def load_inventory_data(
+            self
+            ) -> dict[str, dict[str, str]]:
+        """
+        棚卸リストを取得します。
+
+        Returns:
+            dict[str, dict[str, str]]: 棚卸リストの表データ
+
+        Raises:
+            Exception: 想定外のエラー
+        """
+
+        return dict(self.iter_inventory_data())
+
+    @abstractmethod
+    def update(
+            self,
+            diff: dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]],
+            audit_sheet: str | None = None
+            ) -> bool:
+        """
+        棚卸リストをdiffの内容で更新します。ファイルは保存しません。
+
+        Args:
+            diff (dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]]): 棚卸リストと技術資産管理表の差分
+            audit_sheet (str | None): 変更前後の値を記録するシートの名前（Excelのみ）。Noneの場合は記録しません。
+
+        Returns:
+            bool: すべての差分を反映できた場合はTrue、反映できない差分があった場合はFalse
+        """
+
+    @abstractmethod
+    def save(
+            self,
+            file_path: str
+            ) -> None:
+        """
+        棚卸リストを保存します。
+
+        Args:
+            file_path (str): 保存先のファイルパス
+        """
+
+    def overwrite(
+            self,
+            diff: dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]],
+            file_path: str
+            ) -> None:
+        """
+        棚卸リストをdiffの内容で上書きして保存します。
+        diffにはイテレータも指定でき、1行分ずつ消費しながら更新します。
+
+        Args:
+            diff (dict[str, dict[str, str]] | Iterable[tuple[str, dict[str, str]]]): 棚卸リストと技術資産管理表の差分
+            file_path (str): 保存先のファイルパス
+        """
+
+        if self.update(diff):
+            self.save(file_path)
+
+    def close(
+            self
+            ) -> None:
+        """
+        リソースを解放します。
+        """
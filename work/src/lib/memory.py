@@ -0,0 +1,271 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from collections.abc import Iterator
+
+try:
+    import resource  # Windowsには存在しません。
+except ImportError:
+    resource = None
+
+from lib.log import LOG
+
+MB = 1024 * 1024
+
+def current_rss(
+        ) -> int | None:
+    """
+    現在の常駐メモリ（RSS）を取得します。取得できない環境ではNoneを返します。
+
+    Returns:
+        int | None: RSS（バイト）
+    """
+
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def peak_rss(
+        ) -> int | None:
+    """
+    プロセス開始からの常駐メモリ（RSS）の最大値を取得します。取得できない環境ではNoneを返します。
+    プロセス全体で累積した値のため、段階ごとの最大値には使用できません。
+
+    Returns:
+        int | None: RSSの最大値（バイト）
+    """
+
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024  # Linuxの単位はKB
+
+def format_size(
+        size: int | None
+        ) -> str:
+    return "n/a" if size is None else f"{size / MB:.1f}MB"
+
+class RssSampler():
+    """
+    withブロックの間、別スレッドで現在のRSSを定期的に取得し、その最大値を記録します。
+    getrusage()のru_maxrssはプロセス開始からの最大値のため、段階ごとの最大値はこの方法で計測します。
+    サンプリングの間隔より短く増減したメモリは捉えられないため、最大値は目安です。
+    """
+
+    THREAD_NAME = "rss-sampler"  # /procを読むだけで、forkした子プロセスが使用するロックは取得しません。
+
+    def __init__(
+            self,
+            interval: float = 0.01
+            ) -> None:
+        """
+        Args:
+            interval (float): RSSを取得する間隔（秒）
+        """
+
+        self.__interval = interval
+        self.__stop = threading.Event()
+        self.__thread: threading.Thread | None = None
+        self.start: int | None = None  # 開始時のRSS
+        self.end: int | None = None  # 終了時のRSS
+        self.peak: int | None = None  # 計測中のRSSの最大値
+
+    def __sample(
+            self
+            ) -> None:
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def __run(
+            self
+            ) -> None:
+        while not self.__stop.wait(self.__interval):
+            self.__sample()
+
+    def __enter__(
+            self
+            ) -> "RssSampler":
+        self.start = current_rss()
+        self.peak = self.start
+        if self.start is not None:  # RSSを取得できない環境ではスレッドを起動しません。
+            self.__thread = threading.Thread(target=self.__run, name=self.THREAD_NAME, daemon=True)
+            self.__thread.start()
+        return self
+
+    def __exit__(
+            self,
+            *exc_info
+            ) -> None:
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        self.__sample()
+        self.end = current_rss()
+
+class MemoryMonitor():
+    """
+    処理の段階ごとに、開始時と終了時のRSS、段階中にサンプリングしたRSSの最大値、
+    tracemallocで計測したPythonのメモリ確保量の最大値を記録します。
+    あわせて、getrusage()で取得したプロセス開始からのRSSの最大値（累積）も記録します。
+    """
+
+    def __init__(
+            self,
+            enabled: bool
+            ) -> None:
+        """
+        Args:
+            enabled (bool): 計測する場合はTrue。tracemallocは処理が遅くなるため、必要な場合のみ有効にします。
+        """
+
+        self.__enabled = enabled
+        # 段階名, 所要時間, 開始時のRSS, 終了時のRSS, 段階中のRSSの最大値, プロセス開始からのRSSの最大値, tracemallocの最大値
+        self.__stages: list[tuple[str, float, int | None, int | None, int | None, int | None, int]] = []
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(
+            self,
+            name: str
+            ) -> Iterator[None]:
+        """
+        withブロックの処理を1つの段階として計測します。
+
+        Args:
+            name (str): 段階名
+        """
+
+        if not self.__enabled:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        started = time.monotonic()
+        sampler = RssSampler()
+        try:
+            with sampler:
+                yield
+        finally:
+            _, traced_peak = tracemalloc.get_traced_memory()
+            cumulative_peak = peak_rss()
+            elapsed = time.monotonic() - started
+            self.__stages.append((name, elapsed, sampler.start, sampler.end, sampler.peak, cumulative_peak, traced_peak))
+            LOG.info(f"[memory] {name}: RSS {format_size(sampler.start)} -> {format_size(sampler.end)} "
+                     f"(stage peak {format_size(sampler.peak)}, process peak so far {format_size(cumulative_peak)}), "
+                     f"traced peak {format_size(traced_peak)}, {elapsed:.2f}s")
+
+    def report(
+            self
+            ) -> None:
+        """
+        各段階の計測結果をまとめてログに出力します。
+        """
+
+        if not self.__enabled or len(self.__stages) == 0:
+            return
+        lines = [f"  {name:<44} RSS {format_size(start):>10} -> {format_size(end):>10}  "
+                 f"stage peak {format_size(peak):>10}  process peak {format_size(cumulative):>10}  "
+                 f"traced peak {format_size(traced):>10}  {elapsed:7.2f}s"
+                 for name, elapsed, start, end, peak, cumulative, traced in self.__stages]
+        LOG.info("Memory high-water marks by stage "
+                 "(process peak is the cumulative getrusage() value since the process started):\n" + "\n".join(lines))
+
+class MemoryBudget():
+    """
+    メモリの上限（--max_memory）に対して、読み込む前に入力のサイズからメモリ使用量を見積もります。
+    見積もりは目安のため、係数には余裕を持たせています。
+    """
+
+    WORKBOOK_FACTOR = 50  # openpyxlの編集モードは、xlsxファイルサイズのおよそ50倍のメモリを使用します。
+    HTML_FACTOR = 10  # BeautifulSoupの木構造は、HTMLテキストのおよそ10倍のメモリを使用します。
+
+    def __init__(
+            self,
+            max_memory: float | None
+            ) -> None:
+        """
+        Args:
+            max_memory (float | None): メモリの上限（MB）。Noneの場合は無制限です。
+        """
+
+        self.__limit = None if max_memory is None else int(max_memory * MB)
+
+    @property
+    def enabled(
+            self
+            ) -> bool:
+        return self.__limit is not None
+
+    def fits(
+            self,
+            name: str,
+            projected: int
+            ) -> bool:
+        """
+        現在のRSSに見積もったメモリ使用量を加えても上限を超えないかを確認します。
+
+        Args:
+            name (str): ログ出力用の処理の名前
+            projected (int): 見積もったメモリ使用量（バイト）
+
+        Returns:
+            bool: 上限を超えない場合、または上限が無い場合はTrue
+        """
+
+        if self.__limit is None:
+            return True
+        rss = current_rss() or 0
+        fits = rss + projected <= self.__limit
+        LOG.debug(f"Projected memory for {name}: {format_size(projected)} "
+                  f"(current RSS {format_size(rss)}, budget {format_size(self.__limit)})")
+        if not fits:
+            LOG.info(f"{name} would exceed the memory budget({format_size(self.__limit)}). "
+                     f"Switch to the low-memory path.")
+        return fits
+
+    def fits_workbook(
+            self,
+            file_path: str
+            ) -> bool:
+        """
+        Excelファイルを編集モードで読み込んでも上限を超えないかを確認します。
+
+        Args:
+            file_path (str): Excelファイルのファイルパス
+
+        Returns:
+            bool: 上限を超えない場合はTrue
+        """
+
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return True  # 読み込み時にエラーとして扱います。
+        return self.fits("Loading the workbook", size * self.WORKBOOK_FACTOR)
+
+    def fits_html(
+            self,
+            html_length: int
+            ) -> bool:
+        """
+        管理者用ページをBeautifulSoupで解析しても上限を超えないかを確認します。
+
+        Args:
+            html_length (int): HTMLテキストの長さ
+
+        Returns:
+            bool: 上限を超えない場合はTrue
+        """
+
+        return self.fits("Parsing the asset table", html_length * self.HTML_FACTOR)
@@ -0,0 +1,295 @@
+import csv
+import os
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import openpyxl.utils
+
+from lib.inventory import InventorySource
+
+class Preflight():
+    """
+    棚卸リストを読み込む前に、列名とステータス列だけを確認します。
+    xlsxファイルはopenpyxlで読み込まず、zipから対象シートの先頭の数行と、その行が参照する共有文字列だけを読み込みます。
+    """
+
+    PREVIEW_ROWS = 20  # 確認する表の行数（表の先頭から）
+    __NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    __NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+    __NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+    def __init__(
+            self,
+            sheet_name: str | None,
+            encoding: str = "utf-8-sig"
+            ) -> None:
+        """
+        Args:
+            sheet_name (str | None): Excelのシート名（CSV/TSVの場合は不要）
+            encoding (str): CSV/TSVの文字コード
+        """
+
+        self.__sheet_name = sheet_name
+        self.__encoding = encoding
+        self.__last_row = InventorySource.START_LOW + self.PREVIEW_ROWS - 1
+        self.__max_col = max(openpyxl.utils.column_index_from_string(column_letter)
+                             for column_letter in InventorySource.COLUMN_NAMES)
+
+    def find_sheet_path(
+            self,
+            archive: zipfile.ZipFile
+            ) -> str | None:
+        """
+        workbook.xmlとそのリレーションから、対象シートのXMLファイルのパスを取得します。
+        比較結果のキャッシュ（lib.cache.ResultCache）のキーの作成にも使用します。
+
+        Args:
+            archive (zipfile.ZipFile): xlsxファイル
+
+        Returns:
+            str | None: zip内のシートのパス。シートが無い場合はNone
+        """
+
+        with archive.open("xl/workbook.xml") as f:
+            sheets = {sheet.get("name"): sheet.get(f"{self.__NS_REL}id")
+                      for sheet in ET.parse(f).iter(f"{self.__NS_MAIN}sheet")}
+        if self.__sheet_name not in sheets:
+            return None
+
+        with archive.open("xl/_rels/workbook.xml.rels") as f:
+            for rel in ET.parse(f).iter(f"{self.__NS_PKG_REL}Relationship"):
+                if rel.get("Id") == sheets[self.__sheet_name]:
+                    target = rel.get("Target")
+                    # Targetはxl/からの相対パス、またはzipのルートからの絶対パスです。
+                    if target.startswith("/"):
+                        return target.lstrip("/")
+                    return posixpath.normpath(posixpath.join("xl", target))
+        return None
+
+    def __read_shared_strings(
+            self,
+            archive: zipfile.ZipFile,
+            indexes: set[int]
+            ) -> dict[int, str]:
+        """
+        共有文字列のうち、indexesの文字列だけを先頭から読み込みます。最大のインデックスまで読んだら打ち切ります。
+
+        Args:
+            archive (zipfile.ZipFile): xlsxファイル
+            indexes (set[int]): 必要な共有文字列のインデックス
+
+        Returns:
+            dict[int, str]: インデックスと文字列の対応
+        """
+
+        strings = {}
+        if len(indexes) == 0 or "xl/sharedStrings.xml" not in archive.namelist():
+            return strings
+
+        last_index = max(indexes)
+        index = 0
+        with archive.open("xl/sharedStrings.xml") as f:
+            for _, element in ET.iterparse(f):
+                if element.tag != f"{self.__NS_MAIN}si":
+                    continue
+                if index in indexes:
+                    strings[index] = self.__get_text(element)
+                if index == last_index:
+                    break
+                index += 1
+                element.clear()
+        return strings
+
+    def __get_text(
+            self,
+            element: ET.Element
+            ) -> str:
+        """
+        文字列の要素（siまたはis）のテキストを取得します。ふりがな（rPh）は含めません。
+        """
+
+        texts = []
+        for child in element:
+            if child.tag == f"{self.__NS_MAIN}t":
+                texts.append(child.text or "")
+            elif child.tag == f"{self.__NS_MAIN}r":
+                texts += [t.text or "" for t in child.iter(f"{self.__NS_MAIN}t")]
+        return "".join(texts)
+
+    def __read_xlsx_rows(
+            self,
+            file_path: str
+            ) -> dict[int, list[str | None]] | None:
+        """
+        xlsxファイルの対象シートから、表の先頭の数行までの値を読み込みます。
+
+        Args:
+            file_path (str): xlsxファイルのファイルパス
+
+        Returns:
+            dict[int, list[str | None]] | None: 行番号と、A列からの値のリスト。シートが無い場合はNone
+        """
+
+        with zipfile.ZipFile(file_path) as archive:
+            sheet_path = self.find_sheet_path(archive)
+            if sheet_path is None:
+                return None
+
+            rows: dict[int, list] = {}
+            shared_indexes = set()
+            row_num = 0
+            with archive.open(sheet_path) as f:
+                for _, element in ET.iterparse(f):
+                    if element.tag != f"{self.__NS_MAIN}row":
+                        continue
+                    # r属性が省略されている場合は、直前の行の次の行とします。
+                    row_num = int(element.get("r", row_num + 1))
+                    if row_num > self.__last_row:
+                        break
+
+                    values = [None] * self.__max_col
+                    col = 0
+                    for cell in element.iter(f"{self.__NS_MAIN}c"):
+                        reference = cell.get("r")
+                        col = openpyxl.utils.column_index_from_string(
+                            reference.rstrip("0123456789")) if reference else col + 1
+                        if col > self.__max_col:
+                            continue
+                        cell_type = cell.get("t")
+                        if cell_type == "inlineStr":
+                            inline = cell.find(f"{self.__NS_MAIN}is")
+                            value = None if inline is None else self.__get_text(inline)
+                        else:
+                            v = cell.find(f"{self.__NS_MAIN}v")
+                            value = None if v is None else v.text
+                            if cell_type == "s" and value is not None:
+                                value = int(value)  # 共有文字列のインデックス（後で文字列に置き換えます）
+                                shared_indexes.add(value)
+                        values[col - 1] = (cell_type, value)
+                    rows[row_num] = values
+                    element.clear()
+
+            strings = self.__read_shared_strings(archive, shared_indexes)
+
+        result = {}
+        for row_num, values in rows.items():
+            result[row_num] = [
+                None if value is None else (strings.get(value[1]) if value[0] == "s" else value[1])
+                for value in values
+                ]
+        return result
+
+    def __read_csv_rows(
+            self,
+            file_path: str
+            ) -> dict[int, list[str | None]]:
+        """
+        CSV/TSVファイルから、表の先頭の数行までの値を読み込みます。
+
+        Args:
+            file_path (str): CSV/TSVファイルのファイルパス
+
+        Returns:
+            dict[int, list[str | None]]: 行番号と、A列からの値のリスト
+        """
+
+        delimiter = "\t" if os.path.splitext(file_path)[1].lower() == ".tsv" else ","
+        rows = {}
+        with open(file_path, encoding=self.__encoding, newline="") as f:
+            for row_num, values in enumerate(csv.reader(f, delimiter=delimiter), start=1):
+                if row_num > self.__last_row:
+                    break
+                rows[row_num] = (values + [None] * self.__max_col)[:self.__max_col]
+        return rows
+
+    def __validate(
+            self,
+            rows: dict[int, list[str | None]]
+            ) -> list[str]:
+        """
+        列名の行とステータス列を確認します。
+
+        Args:
+            rows (dict[int, list[str | None]]): 行番号と、A列からの値のリスト
+
+        Returns:
+            list[str]: 見つかった問題（問題が無ければ空）
+        """
+
+        problems = []
+        empty = [None] * self.__max_col
+
+        # 列名を確認します。
+        header = rows.get(InventorySource.COLUMN_NAME_ROW, empty)
+        for column_letter, expected_value in InventorySource.COLUMN_NAMES.items():
+            actual_value = header[openpyxl.utils.column_index_from_string(column_letter) - 1]
+            if actual_value != expected_value:
+                problems.append(f"The {column_letter}{InventorySource.COLUMN_NAME_ROW} value was expected to be "
+                                f"'{expected_value}', but it was '{actual_value}'.")
+
+        # 表の1行目のステータス列に値が入っていなければ、表の最終行を見つけられません。
+        statuses = [(row_num, rows.get(row_num, empty)[0])
+                    for row_num in range(InventorySource.START_LOW, self.__last_row + 1)]
+        first_row, first_status = statuses[0]
+        if first_status not in InventorySource.STATUS_VALUES:
+            problems.append(f"The A{first_row} value was expected to be one of {InventorySource.STATUS_VALUES}, "
+                            f"but it was '{first_status}'.")
+            return problems
+
+        # 表は、ステータス列の値が想定外になる直前の行で終わります。その後ろに表の続きがあれば、読み込まれません。
+        end = next((row_num for row_num, status in statuses if status not in InventorySource.STATUS_VALUES), None)
+        if end is not None:
+            following = [row_num for row_num, status in statuses
+                         if row_num > end and status in InventorySource.STATUS_VALUES]
+            if len(following) != 0:
+                problems.append(f"The table ends at row {end - 1} because A{end} is '{statuses[end - first_row][1]}', "
+                                f"but row {following[0]} has a status value.")
+        return problems
+
+    def check(
+            self,
+            file_path: str
+            ) -> list[str]:
+        """
+        1つの棚卸リストを確認します。
+
+        Args:
+            file_path (str): 棚卸リストのファイルパス（.xlsx/.xlsm/.csv/.tsv）
+
+        Returns:
+            list[str]: 見つかった問題（問題が無ければ空）
+        """
+
+        try:
+            if os.path.splitext(file_path)[1].lower() in [".csv", ".tsv"]:
+                rows = self.__read_csv_rows(file_path)
+            else:
+                rows = self.__read_xlsx_rows(file_path)
+                if rows is None:
+                    return [f"The '{self.__sheet_name}' sheet doesn't exist."]
+        except FileNotFoundError:
+            return [f"'{file_path}' doesn't exist."]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile, ET.ParseError) as ex:
+            return [f"Failed to read the file: {ex!r}"]
+        return self.__validate(rows)
+
+    def check_all(
+            self,
+            file_paths: list[str],
+            workers: int = 8
+            ) -> dict[str, list[str]]:
+        """
+        複数の棚卸リストを並列に確認します。
+
+        Args:
+            file_paths (list[str]): 棚卸リストのファイルパスのリスト
+            workers (int): 並列に確認するスレッド数
+
+        Returns:
+            dict[str, list[str]]: ファイルパスと、見つかった問題の対応（file_pathsの順）
+        """
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(file_paths, executor.map(self.check, file_paths)))
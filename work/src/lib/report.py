@@ -0,0 +1,121 @@
+import csv
+import json
+import os
+from collections.abc import Iterable, Iterator
+
+import openpyxl
+
+from lib.log import LOG
+from lib.excel import Excel
+
+class DiffReport():
+    COLUMN_NAMES = Excel.AUDIT_COLUMN_NAMES  # レポートの列名（Excelの監査用シートと同じ）
+    SHEET_NAME = "差分"  # xlsx形式のレポートのシート名
+
+    @staticmethod
+    def __iter_records(
+            diff: Iterable[tuple[str, dict[str, str]]]
+            ) -> Iterator[list]:
+        """
+        差分をレポートの1セル分ずつのレコードに変換します。
+
+        Args:
+            diff (Iterable[tuple[str, dict[str, str]]]): Excelと技術資産管理表の差分
+
+        Yields:
+            list: 行番号、セル、列名、変更前の値、変更後の値
+        """
+
+        column_letters = Excel.COLUMN_LETTERS
+        for row_num, changes in diff:
+            for column_name, change in changes.items():
+                yield [
+                    int(row_num),
+                    f"{column_letters.get(column_name, '?')}{row_num}",
+                    column_name,
+                    change.get("Before", ""),
+                    change["After"]
+                    ]
+
+    @staticmethod
+    def __write_csv(
+            records: Iterator[list],
+            file_path: str,
+            delimiter: str
+            ) -> int:
+        count = 0
+        with open(file_path, "w", encoding="utf-8-sig", newline="") as f:  # Excelで開けるようにBOMを付けます。
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(DiffReport.COLUMN_NAMES)
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        return count
+
+    @staticmethod
+    def __write_jsonl(
+            records: Iterator[list],
+            file_path: str
+            ) -> int:
+        count = 0
+        with open(file_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(dict(zip(DiffReport.COLUMN_NAMES, record)), ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def __write_xlsx(
+            records: Iterator[list],
+            file_path: str
+            ) -> int:
+        # 書き込み専用のワークブックは、行をメモリ上に保持せずにファイルへ書き出します。
+        count = 0
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet(DiffReport.SHEET_NAME)
+        worksheet.append(DiffReport.COLUMN_NAMES)
+        for record in records:
+            worksheet.append(record)
+            count += 1
+        workbook.save(file_path)
+        return count
+
+    @staticmethod
+    def write(
+            diff: Iterable[tuple[str, dict[str, str]]],
+            file_path: str,
+            source_path: str
+            ) -> bool:
+        """
+        差分をレポートファイルに書き出します。形式はファイルの拡張子（.csv/.tsv/.jsonl/.xlsx）で決まります。
+        差分は1セル分ずつ書き出すため、差分の全体をメモリ上に保持しません。
+
+        Args:
+            diff (Iterable[tuple[str, dict[str, str]]]): Excelと技術資産管理表の差分
+            file_path (str): レポートのファイルパス
+            source_path (str): 棚卸リストのファイルパス（誤って上書きしないための確認に使用します）
+
+        Returns:
+            bool: 書き出しに成功した場合はTrue、失敗した場合はFalse
+        """
+
+        if os.path.abspath(file_path) == os.path.abspath(source_path):
+            LOG.error(f"The report path must be different from the worksheet path('{source_path}').")
+            return False
+
+        records = DiffReport.__iter_records(diff)
+        match os.path.splitext(file_path)[1].lower():
+            case ".csv":
+                count = DiffReport.__write_csv(records, file_path, ",")
+            case ".tsv":
+                count = DiffReport.__write_csv(records, file_path, "\t")
+            case ".jsonl":
+                count = DiffReport.__write_jsonl(records, file_path)
+            case ".xlsx":
+                count = DiffReport.__write_xlsx(records, file_path)
+            case extension:
+                LOG.error(f"The report format({extension}) is unexpected. Use .csv, .tsv, .jsonl or .xlsx.")
+                return False
+
+        LOG.info(f"{count} changes have been reported to '{file_path}'.")
+        return True
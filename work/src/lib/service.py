@@ -0,0 +1,326 @@
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+from lib.log import LOG
+
+class AssetSnapshot():
+    """
+    技術検証機管理表の資産データのスナップショットです。
+    同時に更新を要求された場合は、1回の取得結果を共有します。
+    取得に失敗した場合は前回のスナップショットを返し、しばらくの間（失敗が続くほど長く）取得し直しません。
+    """
+
+    def __init__(
+            self,
+            fetch: Callable[[], dict[str, dict[str, str]] | None],
+            retry_backoff: float = 30.0,
+            max_retry_backoff: float = 600.0
+            ) -> None:
+        """
+        Args:
+            fetch (Callable[[], dict[str, dict[str, str]] | None]): 資産データを取得する関数。失敗した場合はNoneを返します。
+            retry_backoff (float): 取得に失敗してから、リクエストを契機に取得し直すまでの待ち時間（秒）。失敗が続くと2倍ずつ延ばします。
+            max_retry_backoff (float): 待ち時間の上限（秒）
+        """
+
+        self.__fetch = fetch
+        self.__lock = threading.Lock()
+        self.__asset_data: dict[str, dict[str, str]] | None = None
+        self.__fetched_at: float | None = None  # 取得時刻（time.time()）
+        self.__refreshing: threading.Event | None = None  # 取得中の場合は完了を通知するイベント
+        self.__retry_backoff = retry_backoff
+        self.__max_retry_backoff = max_retry_backoff
+        self.__failures = 0  # 連続して取得に失敗した回数
+        self.__retry_after: float | None = None  # この時刻（time.time()）まではリクエストを契機に取得し直しません。
+
+    @property
+    def fetched_at(
+            self
+            ) -> float | None:
+        return self.__fetched_at
+
+    def refresh(
+            self
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        資産データを取得し直します。
+        既に他のスレッドが取得中の場合は、新たに取得せずにその結果を待ちます。
+        取得に失敗した場合は、取得したスレッドにも待っていたスレッドにも前回のスナップショットを返します。
+
+        Returns:
+            dict[str, dict[str, str]] | None: 資産データ。一度も取得に成功していない場合はNone
+        """
+
+        with self.__lock:
+            if self.__refreshing is None:
+                self.__refreshing = threading.Event()
+                is_leader = True
+            else:
+                is_leader = False
+            refreshing = self.__refreshing
+
+        if not is_leader:
+            LOG.debug("Wait for the asset data being fetched by another request.")
+            refreshing.wait()
+            with self.__lock:
+                return self.__asset_data
+
+        try:
+            LOG.info("Attempt to fetch asset data.")
+            try:
+                asset_data = self.__fetch()
+            except Exception:
+                LOG.exception("Unexpected error occurred.")
+                asset_data = None
+            with self.__lock:
+                if asset_data is not None:
+                    self.__asset_data = asset_data
+                    self.__fetched_at = time.time()
+                    self.__failures = 0
+                    self.__retry_after = None
+                    LOG.info(f"Successfully fetch asset data. ({len(asset_data)} assets)")
+                else:
+                    # 上流の障害中に、リクエストのたびに取得し直して負荷をかけないようにします。
+                    backoff = min(self.__retry_backoff * (2 ** self.__failures), self.__max_retry_backoff)
+                    self.__failures += 1
+                    self.__retry_after = time.time() + backoff
+                    LOG.error(f"Failed to fetch asset data. Keep the previous snapshot and retry in {backoff:.0f}s or later.")
+                return self.__asset_data
+        finally:
+            with self.__lock:
+                self.__refreshing = None
+            refreshing.set()
+
+    def get(
+            self,
+            max_age: float
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        max_age秒以内に取得した資産データを返します。古い場合は取得し直します。
+        ただし、前回の取得に失敗してから待ち時間が過ぎていない場合は、取得し直さずに前回のスナップショットを返します。
+
+        Args:
+            max_age (float): 許容するスナップショットの経過時間（秒）
+
+        Returns:
+            dict[str, dict[str, str]] | None: 資産データ。取得に失敗した場合はNone
+        """
+
+        with self.__lock:
+            if self.__fetched_at is not None and time.time() - self.__fetched_at <= max_age:
+                return self.__asset_data
+            if self.__retry_after is not None and time.time() < self.__retry_after:
+                LOG.debug("The previous fetch failed. Return the previous snapshot without fetching.")
+                return self.__asset_data
+        return self.refresh()
+
+    def start_refresher(
+            self,
+            interval: float
+            ) -> threading.Thread:
+        """
+        interval秒ごとに資産データを取得し直すデーモンスレッドを開始します。
+
+        Args:
+            interval (float): 更新間隔（秒）
+
+        Returns:
+            threading.Thread: 開始したスレッド
+        """
+
+        def run() -> None:
+            while True:
+                try:
+                    self.refresh()
+                except Exception:
+                    LOG.exception("Unexpected error occurred.")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run, name="snapshot-refresher", daemon=True)
+        thread.start()
+        return thread
+
+class PooledHTTPServer(HTTPServer):
+    """
+    リクエストを固定数のワーカースレッドで処理するHTTPサーバーです。
+    """
+
+    def __init__(
+            self,
+            server_address: tuple[str, int],
+            handler: type[BaseHTTPRequestHandler],
+            workers: int
+            ) -> None:
+        super().__init__(server_address, handler)
+        self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-worker")
+
+    def __process_request_in_worker(
+            self,
+            request,
+            client_address
+            ) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def process_request(
+            self,
+            request,
+            client_address
+            ) -> None:
+        self.__executor.submit(self.__process_request_in_worker, request, client_address)
+
+    def server_close(
+            self
+            ) -> None:
+        super().server_close()
+        self.__executor.shutdown(wait=True)
+
+class ServiceClient():
+    """
+    server.pyで起動したローカルサービスのクライアントです。
+    """
+
+    def __init__(
+            self,
+            url: str,
+            timeout: float = 300.0
+            ) -> None:
+        """
+        Args:
+            url (str): サービスのURL 例）http://127.0.0.1:8765
+            timeout (float): タイムアウト（秒）
+        """
+
+        self.__url = url.rstrip("/")
+        self.__timeout = timeout
+
+    def __request(
+            self,
+            method: str,
+            path: str,
+            body: dict | None = None
+            ) -> dict | None:
+        """
+        サービスにリクエストを送信し、レスポンスのJSONを返します。
+        失敗した場合はNoneを返します。
+        """
+
+        url = f"{self.__url}{path}"
+        LOG.debug(f"Attempt to access '{url}'.")
+        try:
+            res = requests.request(method, url, json=body, timeout=self.__timeout)
+        except requests.RequestException:
+            LOG.exception(f"Failed to access '{url}'.")
+            return None
+        LOG.debug(f"Status code: {res.status_code}")
+        if not res.ok:
+            LOG.error(f"'{url}' returned an error({res.status_code}): {res.text}")
+            return None
+        return res.json()
+
+    def fetch_asset_data(
+            self
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        サービスが保持している資産データを取得します。
+        取得に失敗した場合はNoneを返します。
+
+        Returns:
+            dict[str, dict[str, str]] | None: 技術検証機管理表（管理者用ページ）の資産データ
+        """
+
+        result = self.__request("GET", "/snapshot")
+        return None if result is None else result["asset_data"]
+
+    def check(
+            self,
+            start_date: str,
+            end_date: str,
+            department: str,
+            where: str,
+            targets: list[str] | str
+            ) -> tuple[int, dict[str, dict[str, str]]] | None:
+        """
+        サービスで棚卸の実施確認を行います。
+        失敗した場合はNoneを返します。
+
+        Returns:
+            tuple[int, dict[str, dict[str, str]]] | None: 棚卸対象の資産数と、棚卸が未実施の資産データ
+        """
+
+        result = self.__request("POST", "/check", {
+            "start_date": start_date,
+            "end_date": end_date,
+            "department": department,
+            "where": where,
+            "targets": targets
+            })
+        return None if result is None else (result["targets"], result["unconfirmed"])
+
+    def compare(
+            self,
+            inventory_data: dict[str, dict[str, str]],
+            start_date: str,
+            end_date: str
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        サービスで棚卸リストと技術資産管理表を比較します。
+        失敗した場合はNoneを返します。
+
+        Returns:
+            dict[str, dict[str, str]] | None: Excelと技術資産管理表の差分
+        """
+
+        result = self.__request("POST", "/compare", {
+            "inventory_data": inventory_data,
+            "start_date": start_date,
+            "end_date": end_date
+            })
+        return None if result is None else result["diff"]
+
+def read_json(
+        handler: BaseHTTPRequestHandler
+        ) -> dict:
+    """
+    リクエストボディのJSONを読み込みます。
+
+    Args:
+        handler (BaseHTTPRequestHandler): リクエストハンドラー
+
+    Returns:
+        dict: リクエストボディ
+    """
+
+    length = int(handler.headers.get("Content-Length", 0))
+    return json.loads(handler.rfile.read(length) or b"{}")
+
+def write_json(
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        body: dict
+        ) -> None:
+    """
+    JSONのレスポンスを送信します。
+
+    Args:
+        handler (BaseHTTPRequestHandler): リクエストハンドラー
+        status (int): ステータスコード
+        body (dict): レスポンスボディ
+    """
+
+    data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Content-Length", str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
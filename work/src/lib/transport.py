@@ -0,0 +1,266 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+import urllib3.exceptions
+
+from lib.log import LOG
+
+class DeadlineExceeded(Exception):
+    """
+    1回の実行に許可された時間（デッドライン）を超過した場合に送出されます。
+    """
+
+class TransportPolicy():
+    """
+    HTTP通信のタイムアウト、リトライ、ヘッジリクエスト、デッドラインの設定です。
+    """
+
+    def __init__(
+            self,
+            connect_timeout: float = 5.0,
+            read_timeout: float = 60.0,
+            retries: int = 3,
+            backoff: float = 1.0,
+            hedge_delay: float | None = None,
+            deadline: float | None = None
+            ) -> None:
+        """
+        Args:
+            connect_timeout (float): 接続タイムアウト（秒）
+            read_timeout (float): 読み込みタイムアウト（秒）
+            retries (int): GETリクエストのリトライ回数（0の場合はリトライしない）
+            backoff (float): リトライ間隔の初期値（秒）。リトライ毎に2倍になります。
+            hedge_delay (float | None): ヘッジリクエストを送信するまでの待ち時間（秒）。Noneの場合は送信しません。
+            deadline (float | None): 1回の実行に許可する時間（秒）。Noneの場合は無制限です。
+        """
+
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_delay = hedge_delay
+        self.deadline = deadline
+
+class Transport():
+    """
+    TransportPolicyに従ってrequests.Sessionでリクエストを送信します。
+    """
+
+    RETRY_STATUS_CODES = [502, 503, 504]  # リトライ対象のステータスコード
+    CHUNK_SIZE = 64 * 1024  # レスポンスの本文を読み込む単位（この単位ごとにデッドラインを確認します）
+
+    def __init__(
+            self,
+            session: requests.Session,
+            policy: TransportPolicy
+            ) -> None:
+        self.__session = session
+        self.__policy = policy
+        self.__started = time.monotonic()  # デッドラインの起点
+
+    def __remaining(
+            self
+            ) -> float | None:
+        """
+        デッドラインまでの残り時間を取得します。
+
+        Returns:
+            float | None: 残り時間（秒）。デッドラインが無い場合はNone
+
+        Raises:
+            DeadlineExceeded: デッドラインを超過している場合
+        """
+
+        if self.__policy.deadline is None:
+            return None
+        remaining = self.__policy.deadline - (time.monotonic() - self.__started)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"The deadline({self.__policy.deadline}s) has been exceeded.")
+        return remaining
+
+    def __timeout(
+            self
+            ) -> tuple[float, float]:
+        """
+        デッドラインまでの残り時間を上限として、(接続タイムアウト, 読み込みタイムアウト)を取得します。
+
+        Returns:
+            tuple[float, float]: requestsのtimeout引数
+        """
+
+        connect_timeout = self.__policy.connect_timeout
+        read_timeout = self.__policy.read_timeout
+        remaining = self.__remaining()
+        if remaining is not None:
+            connect_timeout = min(connect_timeout, remaining)
+            read_timeout = min(read_timeout, remaining)
+        return (connect_timeout, read_timeout)
+
+    def __send(
+            self,
+            session: requests.Session,
+            method: str,
+            url: str,
+            attempt: str,
+            abort: threading.Event | None = None,
+            **kwargs
+            ) -> requests.Response:
+        """
+        リクエストを1回送信して、レイテンシをログに出力します。
+        本文は少しずつ読み込み、読み込むたびにデッドラインを確認します。
+        少しずつしか応答しないサーバーでも、読み込みタイムアウトだけではデッドラインを超えて待ち続けるためです。
+
+        Args:
+            session (requests.Session): 使用するセッション
+            method (str): HTTPメソッド
+            url (str): 送信先URL
+            attempt (str): ログ出力用の試行の識別子
+            abort (threading.Event | None): セットされたら本文の読み込みを中断します（ヘッジリクエストで不要になった方）。
+
+        Returns:
+            requests.Response: レスポンス（本文は読み込み済み）
+
+        Raises:
+            requests.RequestException: 通信に失敗した場合
+            DeadlineExceeded: デッドラインを超過した場合
+        """
+
+        started = time.monotonic()
+        try:
+            res = session.request(method, url, timeout=self.__timeout(), stream=True, **kwargs)
+            try:
+                chunks = []
+                # read1()は、届いている分だけを返します（iter_content()はCHUNK_SIZEが揃うまで待ちます）。
+                # urllib3を直接読み込むため、iter_content()と同じくurllib3の例外をrequestsの例外に変換します。
+                try:
+                    while chunk := res.raw.read1(self.CHUNK_SIZE, decode_content=True):
+                        chunks.append(chunk)
+                        self.__remaining()
+                        if abort is not None and abort.is_set():
+                            raise requests.ConnectionError(f"The request to '{url}' was aborted.")
+                except urllib3.exceptions.ReadTimeoutError as ex:
+                    raise requests.Timeout(ex, request=res.request, response=res)
+                except (urllib3.exceptions.ProtocolError, urllib3.exceptions.SSLError) as ex:
+                    raise requests.ConnectionError(ex, request=res.request, response=res)
+                except urllib3.exceptions.DecodeError as ex:
+                    raise requests.exceptions.ContentDecodingError(ex, request=res.request, response=res)
+                res._content = b"".join(chunks)  # res.textやres.contentで参照できるようにします。
+            finally:
+                res.close()
+        except (requests.RequestException, DeadlineExceeded) as ex:
+            LOG.warning(f"{method} '{url}' ({attempt}) failed after {time.monotonic() - started:.3f}s: {ex}")
+            raise
+        LOG.debug(f"{method} '{url}' ({attempt}) took {time.monotonic() - started:.3f}s. "
+                  f"Status code: {res.status_code}")
+        return res
+
+    def __hedged_get(
+            self,
+            url: str,
+            attempt: str
+            ) -> requests.Response:
+        """
+        GETリクエストを送信し、hedge_delay秒以内に応答が無ければ同じリクエストをもう1つ送信して、
+        先に成功した方のレスポンスを返します。
+
+        Args:
+            url (str): 送信先URL
+            attempt (str): ログ出力用の試行の識別子
+
+        Returns:
+            requests.Response: レスポンス
+        """
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        abort = threading.Event()
+        try:
+            primary = executor.submit(self.__send, self.__session, "GET", url, attempt, abort)
+            done, _ = wait([primary], timeout=self.__policy.hedge_delay)
+            if done:
+                return primary.result()
+
+            # ヘッジリクエストは、ログイン済みのCookieを引き継いだ別セッションで送信します。
+            LOG.debug(f"No response from '{url}' within {self.__policy.hedge_delay}s. Send a hedged request.")
+            hedge_session = requests.Session()
+            hedge_session.headers.update(self.__session.headers)
+            hedge_session.cookies.update(self.__session.cookies)
+            hedge = executor.submit(self.__send, hedge_session, "GET", url, f"{attempt}, hedged", abort)
+            hedge.add_done_callback(lambda _: hedge_session.close())
+
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = wait(pending, timeout=self.__remaining(), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise DeadlineExceeded(f"The deadline({self.__policy.deadline}s) has been exceeded.")
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            # 遅れている方のリクエストの完了は待ちませんが、次のチャンクを読んだ時点で中断させます。
+            abort.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get(
+            self,
+            url: str,
+            hedge: bool = False
+            ) -> requests.Response:
+        """
+        GETリクエストを送信します。
+        接続エラー、タイムアウト、RETRY_STATUS_CODESの場合は指数バックオフでリトライします。
+
+        Args:
+            url (str): 送信先URL
+            hedge (bool): ヘッジリクエストを有効にする場合はTrue（hedge_delayが設定されている場合のみ）
+
+        Returns:
+            requests.Response: レスポンス
+
+        Raises:
+            requests.RequestException: リトライ回数を超えて失敗した場合
+            DeadlineExceeded: デッドラインを超過した場合
+        """
+
+        for retry in range(self.__policy.retries + 1):
+            attempt = f"attempt {retry + 1}/{self.__policy.retries + 1}"
+            try:
+                if hedge and self.__policy.hedge_delay is not None:
+                    res = self.__hedged_get(url, attempt)
+                else:
+                    res = self.__send(self.__session, "GET", url, attempt)
+                if res.status_code not in self.RETRY_STATUS_CODES or retry == self.__policy.retries:
+                    return res
+            except (requests.ConnectionError, requests.Timeout):
+                if retry == self.__policy.retries:
+                    raise
+
+            # 次のリトライまで待機します。デッドラインを超えて待機することはありません。
+            delay = self.__policy.backoff * (2 ** retry)
+            remaining = self.__remaining()
+            if remaining is not None:
+                delay = min(delay, remaining)
+            LOG.warning(f"Retry GET '{url}' in {delay:.1f}s.")
+            time.sleep(delay)
+
+    def post(
+            self,
+            url: str,
+            data: dict
+            ) -> requests.Response:
+        """
+        POSTリクエストを送信します。冪等でないためリトライはしません。
+
+        Args:
+            url (str): 送信先URL
+            data (dict): フォームデータ
+
+        Returns:
+            requests.Response: レスポンス
+        """
+
+        return self.__send(self.__session, "POST", url, "attempt 1/1", data=data)
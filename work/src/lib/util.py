@@ -1,8 +1,15 @@
+import argparse
+import os
 import re
 from datetime import datetime
 
 from lib.log import LOG, set_level
 from lib.checksheet import Checksheet
+from lib.inventory import InventorySource
+from lib.excel import Excel
+from lib.csv_inventory import CsvInventory
+from lib.transport import TransportPolicy
+from lib.memory import MemoryBudget, MemoryMonitor
 
 class Util():
     @staticmethod
@@ -94,10 +101,83 @@ class Util():
         if not Util.__are_valid_date(start_date, end_date):
             return False
     
+    @staticmethod
+    def create_inventory(
+        file_path: str,
+        encoding: str = "utf-8-sig"
+        ) -> InventorySource:
+        """
+        ファイルの拡張子に応じた棚卸リストを作成します。
+        .csv/.tsvの場合はCSV/TSV、それ以外の場合はExcelとして扱います。
+
+        Args:
+            file_path (str): 棚卸リストのファイルパス
+            encoding (str): CSV/TSVの文字コード
+
+        Returns:
+            InventorySource: 棚卸リスト
+        """
+
+        if os.path.splitext(file_path)[1].lower() in [".csv", ".tsv"]:
+            return CsvInventory(encoding)
+        else:
+            return Excel()
+
+    @staticmethod
+    def add_transport_arguments(
+        parser: argparse.ArgumentParser
+        ) -> None:
+        """
+        技術検証機管理表との通信設定のコマンドライン引数を追加します。
+
+        Args:
+            parser (argparse.ArgumentParser): コマンドライン引数のパーサー
+        """
+
+        parser.add_argument("--connect_timeout", type=float, required=False, default=5.0,
+                            help="接続タイムアウト（秒）")
+        parser.add_argument("--read_timeout", type=float, required=False, default=60.0,
+                            help="読み込みタイムアウト（秒）")
+        parser.add_argument("--retries", type=int, required=False, default=3,
+                            help="GETリクエストのリトライ回数")
+        parser.add_argument("--backoff", type=float, required=False, default=1.0,
+                            help="リトライ間隔の初期値（秒）。リトライ毎に2倍になる")
+        parser.add_argument("--hedge_delay", type=float, required=False, default=None,
+                            help="管理者用ページの応答がこの秒数を超えたら、もう1つリクエストを送信する")
+        parser.add_argument("--deadline", type=float, required=False, default=None,
+                            help="技術検証機管理表との通信全体の制限時間（秒）")
+
+    @staticmethod
+    def create_transport_policy(
+        args: argparse.Namespace
+        ) -> TransportPolicy:
+        """
+        コマンドライン引数から通信設定を作成します。
+
+        Args:
+            args (argparse.Namespace): add_transport_arguments()で追加したコマンドライン引数
+
+        Returns:
+            TransportPolicy: 通信設定
+        """
+
+        return TransportPolicy(
+            connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout,
+            retries=args.retries,
+            backoff=args.backoff,
+            hedge_delay=args.hedge_delay,
+            deadline=args.deadline
+            )
+
     @staticmethod
     def fetch_asset_data(
         user_id: str,
-        password: str
+        password: str,
+        policy: TransportPolicy | None = None,
+        parse_workers: int = 1,
+        budget: MemoryBudget | None = None,
+        monitor: MemoryMonitor | None = None
         ) -> dict[str, dict[str, str]] | None:
         """
         資産データを取得します。
@@ -106,14 +186,25 @@ class Util():
         Args:
             user_id (str): 管理者用ページのログイン情報（ユーザ名）
             password (str): 管理者用ページのログイン情報（パスワード）
+            policy (TransportPolicy | None): 通信設定
+            parse_workers (int): 管理者用ページの解析に使用するプロセス数
+            budget (MemoryBudget | None): メモリの上限。超えると見積もった場合は逐次解析します。
+            monitor (MemoryMonitor | None): メモリ使用量の計測
 
         Returns:
             dict[str, dict[str, str]] | None: 技術検証機管理表（管理者用ページ）の資産データ
         """
 
-        checksheet = Checksheet()
-        if checksheet.login(user_id, password):
-            asset_list = checksheet.fetch_asset_data()
+        if monitor is None:
+            monitor = MemoryMonitor(False)
+
+        checksheet = Checksheet(policy)
+        with monitor.stage("Download the asset table"):
+            logged_in = checksheet.login(user_id, password)
+        if logged_in:
+            incremental = budget is not None and not budget.fits_html(checksheet.main_page_length)
+            with monitor.stage("HTML parse"):
+                asset_list = checksheet.fetch_asset_data(parse_workers, incremental)
             if asset_list is not None:
                 return asset_list
             else:
@@ -122,4 +213,3 @@ class Util():
         else:
             LOG.error("Failed to login to the administrator's page.")
             return None
-        
\ No newline at end of file
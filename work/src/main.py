@@ -1,43 +1,62 @@
 
 import argparse
+import gc
+import multiprocessing
+import os
 import re
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
 from lib.log import LOG
 from lib.util import Util
 from lib.checksheet import Checksheet
-from lib.excel import Excel
-
-
-def __load_inventory_data(
-        excel: Excel,
+from lib.inventory import InventorySource
+from lib.report import DiffReport
+from lib.cache import ResultCache
+from lib.service import ServiceClient
+from lib.memory import MemoryBudget, MemoryMonitor, RssSampler
+
+# 並列に比較する最小の行数の既定値（--compare_thresholdで変更できます）。
+# 計測に基づく値ではなく、環境によっては6万行でも直列の方が速いため、並列にする場合は実際の行数で計測して調整してください。
+PARALLEL_COMPARE_THRESHOLD = 20000
+PARALLEL_COMPARE_CHUNK_SIZE = 5000  # ワーカープロセスに1回で渡す行数
+
+__shared_asset_data: dict[str, dict[str, str]] | None = None  # ワーカープロセスがfork時に引き継ぐ資産データ
+__shared_asset_data_lock = threading.Lock()  # __shared_asset_dataを使用する並列比較は同時に1つだけ実行します。
+# 他のスレッドが動いていてもforkできるスレッド（子プロセスが使用するロックを取得しないもの）
+__FORK_SAFE_THREAD_NAMES = [RssSampler.THREAD_NAME]
+
+def __load_worksheet(
+        excel: InventorySource,
         file_path: str,
-        sheet_name: str
-        ) -> dict[str, dict[str, str]] | None:
+        sheet_name: str,
+        read_only: bool = False
+        ) -> bool:
     """
-    棚卸リストを取得します。
-    取得に失敗した場合はNoneを返します。
+    棚卸リストのワークシートを読み込み、整合性を確認します。
+    表データは読み込まず、iter_inventory_data()で1行ずつ取得します。
 
     Args:
+        excel (InventorySource): 読み込み先の棚卸リスト（ExcelまたはCSV/TSV）
         file_path (str): Excelファイルのファイルパス
         sheet_name (str): Excelのシート名
+        read_only (bool): 読み取り専用で読み込む場合はTrue
 
     Returns:
-        list[dict]: 棚卸リスト
+        bool: 読み込みに成功した場合はTrue、失敗した場合はFalse
     """
 
-    if not excel.load(file_path, sheet_name):
+    if not excel.load(file_path, sheet_name, read_only):
         LOG.error("Failed to load an excel file or worksheet.")
-        return None
+        return False
     if not excel.is_worksheet_vaild():
         LOG.error(f"The '{sheet_name}' sheet is not in the expected format.")
-        return None
+        return False
+    return True
 
-    try:
-        return excel.load_inventory_data()
-    except Exception:
-        LOG.exception("Unexpected error occurred.")
-        return None
-    
 def __normalize(
         value: str
         ) -> str:
@@ -55,19 +74,17 @@ def __normalize(
     return re.sub(r"\s+", "", value_removed_cr)
 
 def __get_diff(
-        diff: dict,
-        row_num: str,
+        row_diff: dict,
         column_name: str,
         excel_value: str,
         checksheet_value: str
         ):
     """
-    Excelと技術資産管理表の差分をdiffに保持します。
-    dict型は参照渡しのため、diffを返す必要はありません。
+    Excelと技術資産管理表の差分をrow_diffに保持します。
+    dict型は参照渡しのため、row_diffを返す必要はありません。
 
     Args:
-        diff (dict): Excelと技術資産管理表の差分のコレクション
-        row_num (str): ワークシートの行番号
+        row_diff (dict): 1行分のExcelと技術資産管理表の差分のコレクション
         column_name (str): ワークシートの列名
         excel_value (str): ワークシートの値
         checksheet_value (str): 技術資産管理表の値
@@ -76,16 +93,228 @@ def __get_diff(
     normalized_excel_value = __normalize(excel_value)
     normalized_checksheet_value = __normalize(checksheet_value)
     if normalized_excel_value != normalized_checksheet_value:
-        diff[row_num][column_name] = {
+        row_diff[column_name] = {
             "Before": excel_value,
             "After": checksheet_value
             }
 
+def __compare_row(
+        row_num: str,
+        row_data: dict[str, str],
+        asset_data: dict[str, dict[str, str]],
+        start_date: str,
+        end_date: str
+        ) -> dict[str, dict[str, str]]:
+    """
+    棚卸リストの1行と技術資産管理表を比較します。
+
+    Args:
+        row_num (str): ワークシートの行番号
+        row_data (dict[str, str]): 棚卸リストの1行分の表データ
+        asset_data (dict[str, dict[str, str]]): 技術資産管理表
+
+    Returns:
+        dict[str, dict[str, str]]: 1行分のExcelと技術資産管理表の差分
+    """
+
+    row_diff = {}
+    mng_no = row_data["管理番号"]
+    if mng_no == "":
+        LOG.warning(f"Not found the management number for row {row_num} of the worksheet.")
+        return row_diff
+    for column_name, excel_value in row_data.items():
+        match column_name:
+            case "ステータス":
+                # 記入済みで上書き不要の想定です。
+                # TODO: 棚卸対象のみ差分チェックするオプションを追加しても良いかも
+                pass
+
+            case "棚卸結果":
+                # 比較はしませんが、技術資産管理表から棚卸結果を自動判定します。
+                if Checksheet.exist(
+                    asset_data[mng_no]["存在確認"],
+                    asset_data[mng_no]["最終棚卸確認日"],
+                    start_date,
+                    end_date
+                    ):
+                    row_diff[column_name] = {"Before": excel_value, "After": "〇"}
+                else:
+                    row_diff[column_name] = {"Before": excel_value, "After": "×"}
+
+            case "備考":
+                # 上書き対象ですが、「備考（前回以前）」で実施します。
+                pass
+            
+            case "備考（前回以前）":
+                # 「備考（前回以前）」とchecksheetを比較して、差分があれば「備考」に記載する。 ※「備考（前回以前）」は上書き対象外
+                checksheet_value = asset_data[mng_no]["備考、廃棄（年月)"]
+                __get_diff(row_diff, "備考", excel_value, checksheet_value)
+                pass
+
+            case "管理部門":
+                # 上書き不要で比較不要です。
+                pass
+
+            case "管理番号":
+                checksheet_value = mng_no
+                __get_diff(row_diff, column_name, excel_value, checksheet_value)
+
+            case "シリアル（参考）":
+                checksheet_value = asset_data[mng_no]["S/N"]
+                __get_diff(row_diff, column_name, excel_value, checksheet_value)
+
+            case "稟議番号":
+                checksheet_value = Checksheet.extract_approval_number(
+                    asset_data[mng_no]["稟議（取得年月）"]
+                )
+                if excel_value != "" and checksheet_value == "":
+                    # 稟議番号を空で上書きするのはNGなのでExcelの値をそのまま適用します。
+                    LOG.warning(f"Excel({mng_no}) has approval number but asset data does not. "
+                                f"Applay excel value({excel_value}).")
+                elif checksheet_value is not None:
+                    __get_diff(row_diff, column_name, excel_value, checksheet_value)
+
+            case "管理者":
+                checksheet_value = asset_data[mng_no]["管理者"]
+                __get_diff(row_diff, column_name, excel_value, checksheet_value)
+            
+            case "使用場所":
+                checksheet_value = asset_data[mng_no]["使用場所"]
+                __get_diff(row_diff, column_name, excel_value, checksheet_value)
+
+            case "使用者":
+                checksheet_value = asset_data[mng_no]["使用者"]
+                __get_diff(row_diff, column_name, excel_value, checksheet_value)
+            
+            case _:
+                LOG.error(f"There is an Unexpected column name({column_name}).")
+
+    return row_diff
+
+def iter_compare(
+        inventory_rows: Iterable[tuple[str, dict[str, str]]],
+        asset_data: dict[str, dict[str, str]],
+        start_date: str,
+        end_date: str
+        ) -> Iterator[tuple[str, dict[str, str]]]:
+    """
+    棚卸リストを1行ずつ技術資産管理表と比較し、差分がある行を順に返します。
+    メモリ上に保持するのは1行分の表データと差分のみです。
+
+    Args:
+        inventory_rows (Iterable[tuple[str, dict[str, str]]]): 行番号と棚卸リストの表データの組
+        asset_data (dict[str, dict[str, str]]): 技術資産管理表
+
+    Yields:
+        tuple[str, dict[str, str]]: 行番号と、その行のExcelと技術資産管理表の差分
+    """
+
+    for row_num, row_data in inventory_rows:
+        row_diff = __compare_row(row_num, row_data, asset_data, start_date, end_date)
+        if len(row_diff) != 0:
+            yield row_num, row_diff
+
+def __compare_chunk(
+        chunk: list[tuple[str, dict[str, str]]],
+        start_date: str,
+        end_date: str
+        ) -> list[tuple[str, dict[str, str]]]:
+    """
+    ワーカープロセスで棚卸リストの一部の行を比較します。
+    資産データはfork時に引き継いだ__shared_asset_dataを読み取り専用で使用するため、プロセス間で受け渡しません。
+
+    Args:
+        chunk (list[tuple[str, dict[str, str]]]): 行番号と棚卸リストの表データの組のリスト
+
+    Returns:
+        list[tuple[str, dict[str, str]]]: 行番号と、その行のExcelと技術資産管理表の差分の組のリスト（行順）
+    """
+
+    return list(iter_compare(chunk, __shared_asset_data, start_date, end_date))
+
+def __find_running_threads(
+        ) -> list[str]:
+    """
+    forkの妨げになる、現在のスレッド以外で実行中のスレッドを取得します。
+    他のスレッドがロック（ログ出力やHTTP通信で使用するものなど）を取得したままforkすると、
+    子プロセスではそのロックが解放されずにデッドロックする場合があります。
+
+    Returns:
+        list[str]: スレッド名のリスト
+    """
+
+    return [thread.name for thread in threading.enumerate()
+            if thread is not threading.current_thread() and thread.name not in __FORK_SAFE_THREAD_NAMES]
+
+def iter_compare_parallel(
+        inventory_rows: Iterable[tuple[str, dict[str, str]]],
+        asset_data: dict[str, dict[str, str]],
+        start_date: str,
+        end_date: str,
+        workers: int,
+        threshold: int = PARALLEL_COMPARE_THRESHOLD
+        ) -> Iterator[tuple[str, dict[str, str]]]:
+    """
+    棚卸リストを行のまとまりに分けてプロセスプールで並列に比較し、差分がある行を行順に返します。
+    資産データはforkしたワーカープロセスがコピーオンライトで共有するため、ワーカーごとに受け渡しません。
+    行数がthresholdに満たない場合、CPUコアが1つの場合、forkを使用できない環境、他のスレッドが実行中の場合は、
+    iter_compare()と同じく直列に比較します。
+    いずれの場合も結果はiter_compare()と同じです。
+
+    Args:
+        inventory_rows (Iterable[tuple[str, dict[str, str]]]): 行番号と棚卸リストの表データの組
+        asset_data (dict[str, dict[str, str]]): 技術資産管理表
+        workers (int): ワーカープロセス数
+        threshold (int): 並列に比較する最小の行数
+
+    Yields:
+        tuple[str, dict[str, str]]: 行番号と、その行のExcelと技術資産管理表の差分
+    """
+
+    global __shared_asset_data
+
+    # 行数が少なければ直列に比較します。行数は先頭から読み込んで判定します。
+    workers = min(workers, os.cpu_count() or 1)  # CPUコア数を超えて並列にしても速くなりません。
+    inventory_rows = iter(inventory_rows)
+    head = list(islice(inventory_rows, threshold))
+    serial = workers <= 1 or len(head) < threshold or "fork" not in multiprocessing.get_all_start_methods()
+    if not serial and len(running_threads := __find_running_threads()) != 0:
+        LOG.warning(f"Compare serially because other threads are running ({', '.join(running_threads)}).")
+        serial = True
+    if serial:
+        yield from iter_compare(head, asset_data, start_date, end_date)
+        yield from iter_compare(inventory_rows, asset_data, start_date, end_date)
+        return
+
+    def iter_chunks() -> Iterator[list[tuple[str, dict[str, str]]]]:
+        for offset in range(0, len(head), PARALLEL_COMPARE_CHUNK_SIZE):
+            yield head[offset:offset + PARALLEL_COMPARE_CHUNK_SIZE]
+        while chunk := list(islice(inventory_rows, PARALLEL_COMPARE_CHUNK_SIZE)):
+            yield chunk
+
+    with __shared_asset_data_lock:
+        __shared_asset_data = asset_data
+        try:
+            # forkの場合、ワーカープロセスは最初の投入時にまとめて起動され、その時点の資産データを引き継ぎます。
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+                # 棚卸リストを先読みしすぎないように、処理中のまとまりはワーカー数の2倍までにします。
+                pending = deque()
+                for chunk in iter_chunks():
+                    pending.append(executor.submit(__compare_chunk, chunk, start_date, end_date))
+                    if len(pending) >= workers * 2:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+        finally:
+            __shared_asset_data = None
+
 def compare(
         inventory_data: dict[str, dict[str, str]],
         asset_data: dict[str, dict[str, str]],
         start_date: str,
-        end_date: str
+        end_date: str,
+        workers: int = 1,
+        threshold: int = PARALLEL_COMPARE_THRESHOLD
         ) -> dict[str, dict[str, str]]:
     """
     Excelと技術資産管理表を比較します。
@@ -93,89 +322,68 @@ def compare(
     Args:
         inventory_data (dict[str, dict[str, str]]): Excel
         asset_data (dict[str, dict[str, str]]): 技術資産管理表
+        workers (int): 比較に使用するプロセス数。2以上で行数が多い場合は並列に比較します。
+        threshold (int): 並列に比較する最小の行数
 
     Returns:
         dict[str, dict[str, str]]: Excelと技術資産管理表の差分
     """
 
-    diff = {}
-    for row_num, row_data in inventory_data.items():
-        diff[row_num] = {}
-        mng_no = row_data["管理番号"]
-        if mng_no == "":
-            LOG.warning(f"Not found the management number for row {row_num} of the worksheet.")
-            continue
-        for column_name, excel_value in row_data.items():
-            match column_name:
-                case "ステータス":
-                    # 記入済みで上書き不要の想定です。
-                    # TODO: 棚卸対象のみ差分チェックするオプションを追加しても良いかも
-                    pass
-
-                case "棚卸結果":
-                    # 比較はしませんが、技術資産管理表から棚卸結果を自動判定します。
-                    if Checksheet.exist(
-                        asset_data[mng_no]["存在確認"],
-                        asset_data[mng_no]["最終棚卸確認日"],
-                        start_date,
-                        end_date
-                        ):
-                        diff[row_num][column_name] = {"After": "〇"}
-                    else:
-                        diff[row_num][column_name] = {"After": "×"}
-
-                case "備考":
-                    # 上書き対象ですが、「備考（前回以前）」で実施します。
-                    pass
-                
-                case "備考（前回以前）":
-                    # 「備考（前回以前）」とchecksheetを比較して、差分があれば「備考」に記載する。 ※「備考（前回以前）」は上書き対象外
-                    checksheet_value = asset_data[mng_no]["備考、廃棄（年月)"]
-                    __get_diff(diff, row_num, "備考", excel_value, checksheet_value)
-                    pass
-
-                case "管理部門":
-                    # 上書き不要で比較不要です。
-                    pass
-
-                case "管理番号":
-                    checksheet_value = mng_no
-                    __get_diff(diff, row_num, column_name, excel_value, checksheet_value)
-
-                case "シリアル（参考）":
-                    checksheet_value = asset_data[mng_no]["S/N"]
-                    __get_diff(diff, row_num, column_name, excel_value, checksheet_value)
-
-                case "稟議番号":
-                    checksheet_value = Checksheet.extract_approval_number(
-                        asset_data[mng_no]["稟議（取得年月）"]
-                    )
-                    if excel_value != "" and checksheet_value == "":
-                        # 稟議番号を空で上書きするのはNGなのでExcelの値をそのまま適用します。
-                        LOG.warning(f"Excel({mng_no}) has approval number but asset data does not. "
-                                    f"Applay excel value({excel_value}).")
-                    elif checksheet_value is not None:
-                        __get_diff(diff, row_num, column_name, excel_value, checksheet_value)
-
-                case "管理者":
-                    checksheet_value = asset_data[mng_no]["管理者"]
-                    __get_diff(diff, row_num, column_name, excel_value, checksheet_value)
-                
-                case "使用場所":
-                    checksheet_value = asset_data[mng_no]["使用場所"]
-                    __get_diff(diff, row_num, column_name, excel_value, checksheet_value)
-
-                case "使用者":
-                    checksheet_value = asset_data[mng_no]["使用者"]
-                    __get_diff(diff, row_num, column_name, excel_value, checksheet_value)
-                
-                case _:
-                    LOG.error(f"There is an Unexpected column name({column_name}).")
-        
-        if len(diff[row_num]) == 0:
-            diff.pop(row_num)
-    
-    return diff
+    return dict(iter_compare_parallel(inventory_data.items(), asset_data, start_date, end_date, workers, threshold))
+
+def __log_diff(
+        diff: Iterable[tuple[str, dict[str, str]]]
+        ) -> Iterator[tuple[str, dict[str, str]]]:
+    """
+    差分を1行ずつデバッグログに出力しながら、そのまま次の処理に渡します。
+
+    Args:
+        diff (Iterable[tuple[str, dict[str, str]]]): Excelと技術資産管理表の差分
+
+    Yields:
+        tuple[str, dict[str, str]]: 行番号と、その行の差分
+    """
+
+    for row_num, row_diff in diff:
+        LOG.debug(f"Differences in row {row_num}: {row_diff}")
+        yield row_num, row_diff
+
+def __iter_diff(
+        excel: InventorySource,
+        asset_data: dict[str, dict[str, str]],
+        start_date: str,
+        end_date: str,
+        cache: ResultCache | None,
+        key: str | None,
+        cached: list[tuple[str, dict[str, str]]] | None,
+        workers: int,
+        threshold: int
+        ) -> Iterator[tuple[str, dict[str, str]]]:
+    """
+    キャッシュの差分があればそれを、無ければ棚卸リストと技術資産管理表を比較した差分を1行ずつ返します。
+    比較した差分は、最後まで返し終えたらキャッシュに保存します。
+
+    Args:
+        excel (InventorySource): 整合性を確認済みの棚卸リスト
+        asset_data (dict[str, dict[str, str]]): 技術資産管理表
+        start_date (str): 棚卸開始日
+        end_date (str): 棚卸終了日
+        cache (ResultCache | None): 比較結果のキャッシュ（使用しない場合はNone）
+        key (str | None): キャッシュのキー
+        cached (list[tuple[str, dict[str, str]]] | None): キャッシュの差分（無い場合はNone）
+        workers (int): 比較に使用するプロセス数
+        threshold (int): 並列に比較する最小の行数
+
+    Returns:
+        Iterator[tuple[str, dict[str, str]]]: 行番号と、その行のExcelと技術資産管理表の差分
+    """
+
+    if cached is not None:
+        return __log_diff(cached)
+    diff = iter_compare_parallel(excel.iter_inventory_data(), asset_data, start_date, end_date, workers, threshold)
+    if cache is not None:
+        diff = cache.record(key, diff)
+    return __log_diff(diff)
 
 def main(
     args: argparse.Namespace
@@ -188,42 +396,126 @@ def main(
     """
 
     Util.init(args.log_level, args.start_date, args.end_date)
+    monitor = MemoryMonitor(args.memory_report)
+    budget = MemoryBudget(args.max_memory)
 
     # 棚卸リスト（Excelのワークシート）を読み込みます。
-    excel = Excel()
+    # ドライランの場合は読み取り専用で読み込み、棚卸リストは更新しません。
+    # メモリの上限を指定した場合も読み取り専用で読み込み、編集モードでの読み込みは資産データの取得後に判断します。
+    excel = Util.create_inventory(args.file_path, args.encoding)
     LOG.info("Attempt to load worksheet.")
-    inventory_data = __load_inventory_data(excel, args.file_path, args.sheet_name)
-    if inventory_data is None:
+    with monitor.stage("Workbook load"):
+        loaded = __load_worksheet(excel, args.file_path, args.sheet_name, args.dry_run is not None or budget.enabled)
+    if not loaded:
         return
     else:
         LOG.info("Successfully load worksheet.")
 
-    # 技術検証機管理表（管理者用ページ）から資産データを取得します。
+    # 技術検証機管理表（管理者用ページ）またはローカルサービスから資産データを取得します。
     LOG.info("Attempt to fetch asset data.")
-    asset_data = Util.fetch_asset_data(args.user_id, args.password)
+    if args.service_url is None:
+        asset_data = Util.fetch_asset_data(
+            args.user_id, args.password, Util.create_transport_policy(args), args.parse_workers, budget, monitor)
+    else:
+        asset_data = ServiceClient(args.service_url).fetch_asset_data()
     if asset_data is None:
+        excel.close()
         return
     else:
         LOG.info("Successfully fetch asset data.")
 
-    # 差分チェックを行います。
-    diff = compare(inventory_data, asset_data, args.start_date, args.end_date)
-    LOG.debug(f"Differences: {diff}")
-    LOG.info(f"There are {len(diff)} differences between worksheet and asset data.")
-
-    # Excelファイルを更新して新規作成します。
-    excel.overwrite(diff, args.file_path)
-    excel.WORKBOOK.close()  # リソース解放
+    # 棚卸リストを1行ずつ読み込んで差分チェックを行い、差分をそのままExcelファイルに反映します。
+    # 棚卸リストの表データと差分の全体をメモリ上に保持することはありません。
+    try:
+        # 棚卸リスト、資産データ、棚卸実施期間が前回と同じであれば、差分チェックを省略してキャッシュの差分を使用します。
+        cache = None
+        key = None
+        cached = None
+        if args.cache_dir is not None:
+            cache = ResultCache(args.cache_dir, args.cache_max_mb, args.cache_max_age)
+            with monitor.stage("Cache lookup"):
+                key = cache.key(args.file_path, args.sheet_name, asset_data, args.start_date, args.end_date)
+                if key is None:
+                    cache = None  # キーを作成できない場合は、キャッシュを使用せずに比較します。
+                else:
+                    cached = cache.get(key)
+
+        if args.dry_run is not None:
+            with monitor.stage("load_inventory_data + compare + report"):
+                diff = __iter_diff(excel, asset_data, args.start_date, args.end_date, cache, key, cached,
+                                   args.compare_workers, args.compare_threshold)
+                DiffReport.write(diff, args.dry_run, args.file_path)
+            return
+
+        diff = None
+        if budget.enabled:
+            if not budget.fits_workbook(args.file_path):
+                # 編集モードのワークブックと資産データが同時にメモリ上に存在しないように、
+                # 読み取り専用のまま差分を求めてから資産データを解放します。
+                with monitor.stage("load_inventory_data + compare (read-only)"):
+                    diff = list(__iter_diff(excel, asset_data, args.start_date, args.end_date, cache, key, cached,
+                                            args.compare_workers, args.compare_threshold))
+                asset_data = None
+                gc.collect()
+
+            # 上書きするために編集モードで読み込み直します。
+            excel.close()
+            with monitor.stage("Workbook load (edit mode)"):
+                if not __load_worksheet(excel, args.file_path, args.sheet_name):
+                    return
+
+        with monitor.stage("load_inventory_data + compare + update" if diff is None else "update"):
+            if diff is None:
+                diff = __iter_diff(excel, asset_data, args.start_date, args.end_date, cache, key, cached,
+                                   args.compare_workers, args.compare_threshold)
+            updated = excel.update(diff, args.audit_sheet)
+        if updated:
+            with monitor.stage("Save"):
+                excel.save(args.file_path)
+    except Exception:
+        LOG.exception("Unexpected error occurred.")
+    finally:
+        excel.close()  # リソース解放
+        monitor.report()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export inventory data from the webpage")
-    parser.add_argument("-u", "--user_id", type=str, required=True, help="技術検証機管理表のユーザーID")
-    parser.add_argument("-p", "--password", type=str, required=True, help="技術検証機管理表のパスワード")
-    parser.add_argument("-f", "--file_path", type=str, required=True, help="Excel (実棚リスト) のファイルパス")
-    parser.add_argument("-s", "--sheet_name", type=str, required=True, help="Excelのシート名")
+    parser.add_argument("-u", "--user_id", type=str, required=False, help="技術検証機管理表のユーザーID")
+    parser.add_argument("-p", "--password", type=str, required=False, help="技術検証機管理表のパスワード")
+    parser.add_argument("-f", "--file_path", type=str, required=True, help="Excel (実棚リスト) のファイルパス（.csv/.tsvも可）")
+    parser.add_argument("-s", "--sheet_name", type=str, required=False, default=None, help="Excelのシート名（CSV/TSVの場合は不要）")
+    parser.add_argument("--encoding", type=str, required=False, default="utf-8-sig", help="CSV/TSVの文字コード 例）cp932")
     parser.add_argument("-start", "--start_date", type=str, required=True, help="棚卸開始日 例）2024/12/01")
     parser.add_argument("-end", "--end_date", type=str, required=True, help="棚卸終了日 例）2024/12/31")
     parser.add_argument("-l", "--log_level", type=str, required=False, default="info", choices=["debug", "info", "warning", "error"], help="ログレベル")
+    parser.add_argument("-n", "--dry_run", "--dry-run", dest="dry_run", type=str, required=False, default=None,
+                        metavar="REPORT_PATH",
+                        help="Excelファイルを更新せずに、差分をレポート（.csv/.tsv/.jsonl/.xlsx）に出力する")
+    parser.add_argument("--audit_sheet", type=str, required=False, default=None,
+                        help="更新したセルの変更前後の値を記録するシートの名前（Excelのみ）。同名のシートがあれば作り直す")
+    parser.add_argument("--parse_workers", type=int, required=False, default=1,
+                        help="管理者用ページの解析に使用するプロセス数（2以上で並列に解析）")
+    parser.add_argument("--compare_workers", type=int, required=False, default=1,
+                        help="差分チェックに使用するプロセス数（2以上で、--compare_threshold行以上の場合に並列に比較）")
+    parser.add_argument("--compare_threshold", type=int, required=False, default=PARALLEL_COMPARE_THRESHOLD,
+                        help="並列に比較する最小の行数。環境によって最適な値が異なるため、計測して調整する")
+    parser.add_argument("--max_memory", type=float, required=False, default=None,
+                        help="メモリの上限（MB）。超えると見積もった場合は省メモリの処理に切り替える")
+    parser.add_argument("--memory_report", action="store_true",
+                        help="処理の段階ごとにメモリ使用量の最大値を出力する")
+    parser.add_argument("--service_url", type=str, required=False, default=None,
+                        help="技術検証機管理表の代わりに使用するローカルサービス（server.py）のURL 例）http://127.0.0.1:8765")
+    parser.add_argument("--cache_dir", type=str, required=False, default=None,
+                        help="比較結果のキャッシュを保存するフォルダ。入力が前回と同じ場合は差分チェックを省略する")
+    parser.add_argument("--cache_max_mb", type=float, required=False, default=100,
+                        help="キャッシュ全体の大きさの上限（MB）")
+    parser.add_argument("--cache_max_age", type=float, required=False, default=30,
+                        help="キャッシュの有効期間（日）")
+    Util.add_transport_arguments(parser)
 
     args = parser.parse_args()
+    if args.service_url is None and (args.user_id is None or args.password is None):
+        parser.error("the following arguments are required: -u/--user_id, -p/--password")
+    if args.sheet_name is None and os.path.splitext(args.file_path)[1].lower() not in [".csv", ".tsv"]:
+        parser.error("the following arguments are required for an Excel file: -s/--sheet_name")
     main(args)
\ No newline at end of file
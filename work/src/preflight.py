@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+
+from lib.log import LOG, set_level
+from lib.preflight import Preflight
+
+
+def main(
+    args: argparse.Namespace
+    ) -> bool:
+    """
+    複数の棚卸リストの列名とステータス列を、ワークブック全体を読み込まずに確認するメイン関数
+
+    Args:
+        args (argparse.Namespace): コマンドライン引数
+
+    Returns:
+        bool: すべての棚卸リストに問題が無ければTrue
+    """
+
+    if not set_level(args.log_level):
+        LOG.error("Failed to set log level.")
+        return False
+
+    started = time.monotonic()
+    results = Preflight(args.sheet_name, args.encoding).check_all(args.file_paths, args.workers)
+    elapsed = time.monotonic() - started
+
+    # 問題はファイルごとにまとめて出力します。
+    failed = 0
+    for file_path, problems in results.items():
+        if len(problems) == 0:
+            LOG.debug(f"'{file_path}' is OK.")
+            continue
+        failed += 1
+        LOG.error(f"'{file_path}' has {len(problems)} problems.\n" + "\n".join(f"  - {problem}" for problem in problems))
+
+    LOG.info(f"{len(results) - failed} of {len(results)} files passed the preflight check in {elapsed:.2f}s.")
+    return failed == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the header and status column of many inventory files.")
+    parser.add_argument("file_paths", nargs="+", help="Excel (実棚リスト) のファイルパス（.csv/.tsvも可）")
+    parser.add_argument("-s", "--sheet_name", type=str, required=False, default=None, help="Excelのシート名（CSV/TSVの場合は不要）")
+    parser.add_argument("--encoding", type=str, required=False, default="utf-8-sig", help="CSV/TSVの文字コード 例）cp932")
+    parser.add_argument("--workers", type=int, required=False, default=8, help="並列に確認するファイル数")
+    parser.add_argument("-l", "--log_level", type=str, required=False, default="info", choices=["debug", "info", "warning", "error"], help="ログレベル")
+
+    args = parser.parse_args()
+    if args.sheet_name is None and any(
+            os.path.splitext(file_path)[1].lower() not in [".csv", ".tsv"] for file_path in args.file_paths):
+        parser.error("the following arguments are required for an Excel file: -s/--sheet_name")
+    sys.exit(0 if main(args) else 1)
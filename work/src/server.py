@@ -0,0 +1,143 @@
+import argparse
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from lib.log import LOG, set_level
+from lib.util import Util
+from lib.service import AssetSnapshot, PooledHTTPServer, read_json, write_json
+from checker import find_unconfirmed
+from main import compare
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    ローカルサービスのリクエストハンドラー
+
+    GET  /snapshot : 資産データ
+    POST /check    : 棚卸の実施確認（機能2）
+    POST /compare  : 棚卸リストと技術資産管理表の比較（機能1）
+
+    いずれもmax_age（秒）を指定すると、それより古いスナップショットは取得し直してから使用します。
+    """
+
+    SNAPSHOT: AssetSnapshot = None  # 資産データのスナップショット
+    MAX_AGE: float = None  # 既定で許容するスナップショットの経過時間（秒）
+
+    def log_message(
+            self,
+            format: str,
+            *args
+            ) -> None:
+        LOG.debug(f"{self.client_address[0]} {format % args}")
+
+    def __asset_data(
+            self,
+            max_age: float | None
+            ) -> dict[str, dict[str, str]] | None:
+        """
+        スナップショットから資産データを取得します。取得できない場合は503を返してNoneを返します。
+        """
+
+        asset_data = self.SNAPSHOT.get(self.MAX_AGE if max_age is None else float(max_age))
+        if asset_data is None:
+            write_json(self, 503, {"error": "Failed to fetch asset data."})
+        return asset_data
+
+    def do_GET(
+            self
+            ) -> None:
+        url = urlparse(self.path)
+        match url.path:
+            case "/snapshot":
+                max_age = parse_qs(url.query).get("max_age", [None])[0]
+                asset_data = self.__asset_data(max_age)
+                if asset_data is not None:
+                    write_json(self, 200, {"fetched_at": self.SNAPSHOT.fetched_at, "asset_data": asset_data})
+            case _:
+                write_json(self, 404, {"error": f"'{url.path}' is not found."})
+
+    def do_POST(
+            self
+            ) -> None:
+        url = urlparse(self.path)
+        try:
+            body = read_json(self)
+        except ValueError:
+            write_json(self, 400, {"error": "The request body is not valid JSON."})
+            return
+
+        try:
+            match url.path:
+                case "/check":
+                    asset_data = self.__asset_data(body.get("max_age"))
+                    if asset_data is None:
+                        return
+                    targets, unconfirmed = find_unconfirmed(
+                        asset_data,
+                        body["start_date"],
+                        body["end_date"],
+                        body.get("department", "RevoWorks BU 開発部"),
+                        body.get("where", "everywhere"),
+                        body.get("targets", "対象 未確認")
+                        )
+                    write_json(self, 200, {"targets": targets, "unconfirmed": unconfirmed})
+                case "/compare":
+                    asset_data = self.__asset_data(body.get("max_age"))
+                    if asset_data is None:
+                        return
+                    diff = compare(body["inventory_data"], asset_data, body["start_date"], body["end_date"])
+                    write_json(self, 200, {"diff": diff})
+                case _:
+                    write_json(self, 404, {"error": f"'{url.path}' is not found."})
+        except (KeyError, ValueError) as ex:
+            LOG.exception("Invalid request.")
+            write_json(self, 400, {"error": f"Invalid request: {ex!r}"})
+
+def main(
+    args: argparse.Namespace
+    ) -> None:
+    """
+    ローカルサービスのメイン関数
+    技術検証機管理表の資産データを定期的に取得し、機能1・機能2をローカルのHTTPで提供します。
+
+    Args:
+        args (argparse.Namespace): コマンドライン引数
+    """
+
+    if not set_level(args.log_level):
+        return
+
+    policy = Util.create_transport_policy(args)
+    ServiceHandler.SNAPSHOT = AssetSnapshot(
+        lambda: Util.fetch_asset_data(args.user_id, args.password, policy, args.parse_workers),
+        args.retry_backoff)
+    ServiceHandler.MAX_AGE = args.refresh_interval
+    ServiceHandler.SNAPSHOT.start_refresher(args.refresh_interval)
+
+    server = PooledHTTPServer((args.host, args.port), ServiceHandler, args.workers)
+    LOG.info(f"Serving on http://{args.host}:{server.server_port} with {args.workers} workers.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve asset data to many users with one upstream fetch.")
+    parser.add_argument("-u", "--user_id", type=str, required=True, help="技術検証機管理表のユーザーID")
+    parser.add_argument("-p", "--password", type=str, required=True, help="技術検証機管理表のパスワード")
+    parser.add_argument("--host", type=str, required=False, default="127.0.0.1", help="待ち受けるアドレス")
+    parser.add_argument("--port", type=int, required=False, default=8765, help="待ち受けるポート番号")
+    parser.add_argument("--workers", type=int, required=False, default=8, help="リクエストを処理するスレッド数")
+    parser.add_argument("--refresh_interval", type=float, required=False, default=300.0,
+                        help="資産データを取得し直す間隔（秒）")
+    parser.add_argument("--retry_backoff", type=float, required=False, default=30.0,
+                        help="資産データの取得に失敗してから取得し直すまでの待ち時間（秒）。失敗が続くと2倍ずつ延ばす")
+    parser.add_argument("--parse_workers", type=int, required=False, default=1,
+                        help="管理者用ページの解析に使用するプロセス数（2以上で並列に解析）")
+    parser.add_argument("-l", "--log_level", type=str, required=False, default="info", choices=["debug", "info", "warning", "error"], help="ログレベル")
+    Util.add_transport_arguments(parser)
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,139 @@
+import argparse
+import os
+
+from lib.log import LOG
+from lib.util import Util
+from lib.index import RowIndex
+from lib.service import ServiceClient
+from main import iter_compare
+
+
+def __load_index(
+        index: RowIndex,
+        file_path: str,
+        sheet_name: str,
+        encoding: str
+        ) -> dict[str, list[int]] | None:
+    """
+    管理番号と行番号の索引を取得します。
+    索引が無い場合やExcelファイルが更新されている場合は、ワークシートを読み取り専用で読み込んで作り直します。
+    取得に失敗した場合はNoneを返します。
+
+    Args:
+        index (RowIndex): 索引
+        file_path (str): Excelファイルのファイルパス
+        sheet_name (str): Excelのシート名
+        encoding (str): CSV/TSVの文字コード
+
+    Returns:
+        dict[str, list[int]] | None: 管理番号と行番号のリストの対応
+    """
+
+    rows = index.load()
+    if rows is not None:
+        return rows
+
+    LOG.info("Attempt to build the index of management numbers.")
+    excel = Util.create_inventory(file_path, encoding)
+    if not excel.load(file_path, sheet_name, read_only=True):
+        LOG.error("Failed to load an excel file or worksheet.")
+        return None
+    try:
+        if not excel.is_worksheet_vaild():
+            LOG.error(f"The '{sheet_name}' sheet is not in the expected format.")
+            return None
+        return index.build(excel)
+    except Exception:
+        LOG.exception("Unexpected error occurred.")
+        return None
+    finally:
+        excel.close()
+
+def main(
+    args: argparse.Namespace
+    ) -> None:
+    """
+    指定した管理番号の行だけを技術資産管理表と比較して、棚卸リストを更新するメイン関数
+
+    Args:
+        args (argparse.Namespace): コマンドライン引数
+    """
+
+    Util.init(args.log_level, args.start_date, args.end_date)
+
+    # 管理番号から更新対象の行番号を求めます。
+    index = RowIndex(args.file_path, args.sheet_name)
+    rows = __load_index(index, args.file_path, args.sheet_name, args.encoding)
+    if rows is None:
+        return
+    mng_nos = []
+    for mng_no in dict.fromkeys(args.mng_nos):  # 重複を除きます（指定順は保ちます）。
+        if mng_no in rows:
+            mng_nos.append(mng_no)
+        else:
+            LOG.warning(f"The management number({mng_no}) is not in the '{args.sheet_name}' sheet.")
+    if len(mng_nos) == 0:
+        LOG.info("There is nothing to update.")
+        return
+
+    # 技術検証機管理表（管理者用ページ）またはローカルサービスから資産データを取得し、対象の資産だけを残します。
+    LOG.info("Attempt to fetch asset data.")
+    if args.service_url is None:
+        asset_data = Util.fetch_asset_data(
+            args.user_id, args.password, Util.create_transport_policy(args), args.parse_workers)
+    else:
+        asset_data = ServiceClient(args.service_url).fetch_asset_data()
+    if asset_data is None:
+        return
+    for mng_no in [mng_no for mng_no in mng_nos if mng_no not in asset_data]:
+        LOG.warning(f"The management number({mng_no}) is not in the asset data.")
+        mng_nos.remove(mng_no)
+    asset_data = {mng_no: asset_data[mng_no] for mng_no in mng_nos}
+    row_nums = sorted(row_num for mng_no in mng_nos for row_num in rows[mng_no])
+
+    # 対象の行だけを比較し、差分のあるセルだけを更新します。
+    excel = Util.create_inventory(args.file_path, args.encoding)
+    LOG.info("Attempt to load worksheet.")
+    if not excel.load(args.file_path, args.sheet_name):
+        LOG.error("Failed to load an excel file or worksheet.")
+        return
+    try:
+        # 索引が最新であることは確認済みのため、表全体ではなく列名と対象の行だけを確認します。
+        if not excel.are_rows_valid(row_nums):
+            LOG.error(f"The '{args.sheet_name}' sheet is not in the expected format.")
+            return
+        diff = list(iter_compare(
+            excel.iter_inventory_data(row_nums), asset_data, args.start_date, args.end_date))
+        for row_num, row_diff in diff:
+            LOG.debug(f"Differences in row {row_num}: {row_diff}")
+        if excel.update(diff):
+            excel.save(args.file_path)
+            index.save(rows)  # 行の並びは変わらないため、索引は作り直さずに最新として扱います。
+    except Exception:
+        LOG.exception("Unexpected error occurred.")
+    finally:
+        excel.close()  # リソース解放
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update only the rows of the given management numbers.")
+    parser.add_argument("mng_nos", nargs="+", help="更新する資産の管理番号")
+    parser.add_argument("-u", "--user_id", type=str, required=False, help="技術検証機管理表のユーザーID")
+    parser.add_argument("-p", "--password", type=str, required=False, help="技術検証機管理表のパスワード")
+    parser.add_argument("-f", "--file_path", type=str, required=True, help="Excel (実棚リスト) のファイルパス（.csv/.tsvも可）")
+    parser.add_argument("-s", "--sheet_name", type=str, required=False, default=None, help="Excelのシート名（CSV/TSVの場合は不要）")
+    parser.add_argument("--encoding", type=str, required=False, default="utf-8-sig", help="CSV/TSVの文字コード 例）cp932")
+    parser.add_argument("-start", "--start_date", type=str, required=True, help="棚卸開始日 例）2024/12/01")
+    parser.add_argument("-end", "--end_date", type=str, required=True, help="棚卸終了日 例）2024/12/31")
+    parser.add_argument("-l", "--log_level", type=str, required=False, default="info", choices=["debug", "info", "warning", "error"], help="ログレベル")
+    parser.add_argument("--parse_workers", type=int, required=False, default=1,
+                        help="管理者用ページの解析に使用するプロセス数（2以上で並列に解析）")
+    parser.add_argument("--service_url", type=str, required=False, default=None,
+                        help="技術検証機管理表の代わりに使用するローカルサービス（server.py）のURL 例）http://127.0.0.1:8765")
+    Util.add_transport_arguments(parser)
+
+    args = parser.parse_args()
+    if args.service_url is None and (args.user_id is None or args.password is None):
+        parser.error("the following arguments are required: -u/--user_id, -p/--password")
+    if args.sheet_name is None and os.path.splitext(args.file_path)[1].lower() not in [".csv", ".tsv"]:
+        parser.error("the following arguments are required for an Excel file: -s/--sheet_name")
+    main(args)
@@ -0,0 +1,111 @@
+import csv
+import random
+from collections.abc import Callable
+
+import openpyxl
+import pytest
+
+from lib.inventory import InventorySource
+
+START_DATE = "2024/12/01"  # 棚卸開始日
+END_DATE = "2024/12/31"  # 棚卸終了日
+SHEET_NAME = "棚卸"
+
+ASSET_COLUMN_NAMES = [  # 技術検証機管理表（管理者用ページ）の列名（管理番号を除く）
+    "登録日", "登録者", "稟議（取得年月）", "メーカ", "製品名型番", "S/N", "カテゴリ", "用途", "保守情報",
+    "ライセンス情報", "管理部署", "管理者", "使用場所", "使用者", "貸出状況", "棚卸対象外", "棚卸し対象外理由",
+    "存在確認", "最終棚卸確認日", "最終棚卸確認者", "備考、廃棄（年月)"
+]
+
+def build_asset_data(
+        count: int,
+        seed: int = 1
+        ) -> dict[str, dict[str, str]]:
+    """
+    差分が出やすいように値を散らした資産データを作成します。
+    """
+
+    rand = random.Random(seed)
+    asset_data = {}
+    for i in range(count):
+        asset = {column_name: "" for column_name in ASSET_COLUMN_NAMES}
+        asset.update({
+            "稟議（取得年月）": rand.choice(["", f"R-{100000 + i} (2020/01)", "none"]),
+            "S/N": f"SN{i}",
+            "管理部署": "RevoWorks BU 開発部",
+            "管理者": rand.choice(["佐藤", "鈴木"]),
+            "使用場所": rand.choice(["9F", "8F 倉庫"]),
+            "使用者": rand.choice(["a", "b"]),
+            "棚卸対象外": "対象",
+            "存在確認": rand.choice(["○", ""]),
+            "最終棚卸確認日": rand.choice(["2024/12/05", "2023/01/01"]),
+            "備考、廃棄（年月)": rand.choice(["", "廃棄 2024/01"])
+        })
+        asset_data[f"M{i:06d}"] = asset
+    return asset_data
+
+def build_main_page(
+        asset_data: dict[str, dict[str, str]]
+        ) -> str:
+    """
+    技術検証機管理表（管理者用ページ）と同じ構造の表を持つHTMLを作成します。
+    """
+
+    header = "".join(f"<th>{column_name}</th>" for column_name in ["管理番号"] + ASSET_COLUMN_NAMES)
+    rows = []
+    for mng_no, asset in asset_data.items():
+        cells = [f"<td><a href='Detail?id={mng_no}'>{mng_no}</a></td>"]
+        cells += [f"<td>{asset[column_name]}</td>" for column_name in ASSET_COLUMN_NAMES]
+        rows.append(f"<tr>{''.join(cells)}</tr>")
+    return (f"<html><body><h1>技術検証機管理表</h1><table><thead><tr>{header}</tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table></body></html>")
+
+def build_rows(
+        count: int,
+        seed: int = 2
+        ) -> list[list[str | None]]:
+    """
+    棚卸リストの1行目から表の最終行の次の行（合計の行）までの値を作成します。
+    """
+
+    rand = random.Random(seed)
+    rows = [["実棚リスト"], list(InventorySource.COLUMN_NAMES.values())]
+    for i in range(count):
+        rows.append([
+            rand.choice(InventorySource.STATUS_VALUES), "", "", rand.choice(["", "廃棄 2024/01"]), "開発部",
+            f"M{i:06d}", f"SN{i if rand.random() < 0.9 else 0}", rand.choice(["", f"R-{100000 + i}"]),
+            rand.choice(["佐藤", "鈴木"]), rand.choice(["9F", "8F 倉庫"]), rand.choice(["a", "b", None])
+        ])
+    rows.append(["合計"])
+    return rows
+
+@pytest.fixture(scope="session")
+def asset_data() -> dict[str, dict[str, str]]:
+    return build_asset_data(300)
+
+@pytest.fixture
+def make_inventory(tmp_path) -> Callable[[str, int], str]:
+    """
+    棚卸リストのファイルを作成する関数を返します。拡張子（.xlsx/.csv）でファイル形式が決まります。
+    """
+
+    def make(
+            file_name: str,
+            count: int = 300
+            ) -> str:
+        file_path = str(tmp_path / file_name)
+        rows = build_rows(count)
+        if file_name.endswith(".xlsx"):
+            workbook = openpyxl.Workbook()
+            worksheet = workbook.active
+            worksheet.title = SHEET_NAME
+            for row in rows:
+                worksheet.append(row)
+            workbook.create_sheet("その他")["A1"] = "対象外のシート"
+            workbook.save(file_path)
+        else:
+            with open(file_path, "w", encoding="utf-8-sig", newline="") as f:
+                csv.writer(f).writerows([["" if value is None else value for value in row] for row in rows])
+        return file_path
+
+    return make
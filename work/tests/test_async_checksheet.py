@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")  # 任意の依存関係（pyproject.tomlのextrasのasync）
+from aiohttp import web
+
+from conftest import build_main_page
+from lib.async_checksheet import AsyncChecksheet
+from lib.transport import TransportPolicy
+
+USER_ID = "user"
+PASSWORD = "password"
+
+def create_app(
+        main_page_html: str,
+        delay: float = 0.0
+        ) -> web.Application:
+    """
+    技術検証機管理表の代わりのサーバーを作成します。
+    ログイン画面でセッションを発行し、正しい認証情報を送信したセッションだけに管理者用ページを返します。
+    それ以外のセッションは、実際のサーバーと同じく技術検証機管理表にリダイレクトします。
+    """
+
+    authenticated = set()
+
+    async def login_page(request: web.Request) -> web.Response:
+        response = web.Response(text="<form action='LogIn' method='post'></form>", content_type="text/html")
+        response.set_cookie("JSESSIONID", uuid.uuid4().hex, path="/")
+        return response
+
+    async def log_in(request: web.Request) -> web.Response:
+        data = await request.post()
+        if data.get("LogIn_ID") == USER_ID and data.get("Password") == PASSWORD:
+            authenticated.add(request.cookies.get("JSESSIONID"))
+        return web.Response(text="ok")
+
+    async def main_page(request: web.Request) -> web.Response:
+        if request.cookies.get("JSESSIONID") not in authenticated:
+            raise web.HTTPFound("/Checksheet/AllProducts")
+        await asyncio.sleep(delay)
+        return web.Response(text=main_page_html, content_type="text/html")
+
+    async def all_products(request: web.Request) -> web.Response:
+        return web.Response(text="<html><body>技術検証機管理表</body></html>", content_type="text/html")
+
+    app = web.Application()
+    app.add_routes([
+        web.get("/Checksheet/login.jsp", login_page),
+        web.post("/Checksheet/LogIn", log_in),
+        web.get("/Checksheet/Main", main_page),
+        web.get("/Checksheet/AllProducts", all_products)
+    ])
+    return app
+
+async def serve(
+        app: web.Application,
+        test
+        ):
+    """
+    サーバーを空いているポートで起動し、そのURLを引数にtestを実行します。
+    """
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        return await test(f"http://127.0.0.1:{port}/Checksheet")
+    finally:
+        await runner.cleanup()
+
+async def login_and_fetch(
+        base_url: str,
+        password: str,
+        connector: aiohttp.BaseConnector | None = None,
+        policy: TransportPolicy | None = None
+        ) -> dict[str, dict[str, str]] | None:
+    checksheet = AsyncChecksheet(policy or TransportPolicy(retries=0), connector=connector, base_url=base_url)
+    if not await checksheet.login(USER_ID, password):
+        return None
+    return await checksheet.fetch_asset_data()
+
+def test_login_and_fetch(asset_data):
+    app = create_app(build_main_page(asset_data))
+    result = asyncio.run(serve(app, lambda base_url: login_and_fetch(base_url, PASSWORD)))
+    assert result == asset_data
+
+def test_wrong_password_is_redirected(asset_data):
+    app = create_app(build_main_page(asset_data))
+    result = asyncio.run(serve(app, lambda base_url: login_and_fetch(base_url, "wrong")))
+    assert result is None
+
+def test_shared_connector_keeps_sessions_separate(asset_data):
+    app = create_app(build_main_page(asset_data), delay=0.05)
+    passwords = [PASSWORD if i % 4 != 0 else "wrong" for i in range(12)]
+
+    async def test(base_url: str) -> list:
+        connector = aiohttp.TCPConnector(limit=4)
+        try:
+            return await asyncio.gather(*[login_and_fetch(base_url, password, connector) for password in passwords])
+        finally:
+            await connector.close()
+
+    results = asyncio.run(serve(app, test))
+    for password, result in zip(passwords, results):
+        assert result == (asset_data if password == PASSWORD else None)
+
+def test_deadline_exceeded(asset_data):
+    app = create_app(build_main_page(asset_data), delay=2.0)
+    policy = TransportPolicy(retries=0, deadline=0.5)
+    result = asyncio.run(serve(app, lambda base_url: login_and_fetch(base_url, PASSWORD, policy=policy)))
+    assert result is None
@@ -0,0 +1,33 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import build_main_page
+from lib.checksheet import Checksheet
+
+def fetch(
+        html: str,
+        **kwargs
+        ) -> dict[str, dict[str, str]] | None:
+    checksheet = Checksheet()
+    checksheet.set_main_page_html(html)
+    return checksheet.fetch_asset_data(**kwargs)
+
+def test_parse_methods_match(asset_data):
+    html = build_main_page(asset_data)
+    serial = fetch(html)
+    assert serial == asset_data
+    assert fetch(html, incremental=True) == serial
+    assert fetch(html, workers=2) == serial
+
+def test_parallel_parse_from_a_thread_while_other_threads_run(asset_data):
+    # サービスのワーカーやAsyncChecksheetのExecutorと同じく、他のスレッドが実行中に別のスレッドから並列に解析します。
+    html = build_main_page(asset_data)
+    stop = threading.Event()
+    busy = threading.Thread(target=stop.wait, daemon=True)
+    busy.start()
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(lambda _: fetch(html, workers=2), range(2)))
+    finally:
+        stop.set()
+    assert all(result == asset_data for result in results)
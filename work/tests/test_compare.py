@@ -0,0 +1,76 @@
+import multiprocessing
+import threading
+
+import pytest
+
+import main
+from conftest import START_DATE, END_DATE, SHEET_NAME, build_asset_data
+from lib.util import Util
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                reason="The parallel compare requires the fork start method.")
+
+ROW_COUNT = 2000
+
+@pytest.fixture(scope="module")
+def asset_data() -> dict[str, dict[str, str]]:
+    return build_asset_data(ROW_COUNT)
+
+@pytest.fixture
+def inventory_rows(make_inventory) -> list[tuple[str, dict[str, str]]]:
+    file_path = make_inventory("compare.xlsx", count=ROW_COUNT)
+    inventory = Util.create_inventory(file_path, "utf-8-sig")
+    assert inventory.load(file_path, SHEET_NAME, read_only=True)
+    try:
+        assert inventory.is_worksheet_vaild()
+        return list(inventory.iter_inventory_data())
+    finally:
+        inventory.close()
+
+@pytest.fixture
+def pools(monkeypatch) -> list[int]:
+    """
+    CPUコアが1つの環境でも並列に比較するように設定し、起動したプロセスプールのワーカー数を記録します。
+    """
+
+    created = []
+
+    class RecordingExecutor(main.ProcessPoolExecutor):
+        def __init__(self, max_workers=None, *args, **kwargs) -> None:
+            created.append(max_workers)
+            super().__init__(max_workers, *args, **kwargs)
+
+    monkeypatch.setattr(main.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(main, "ProcessPoolExecutor", RecordingExecutor)
+    monkeypatch.setattr(main, "PARALLEL_COMPARE_CHUNK_SIZE", 150)  # 多数のまとまりに分けて、行順に返すことを確認します。
+    return created
+
+def test_parallel_matches_serial(inventory_rows, asset_data, pools):
+    serial = list(main.iter_compare(inventory_rows, asset_data, START_DATE, END_DATE))
+    parallel = list(main.iter_compare_parallel(
+        iter(inventory_rows), asset_data, START_DATE, END_DATE, workers=4, threshold=100))
+    assert pools == [4]
+    assert parallel == serial
+    assert len(serial) != 0
+
+def test_below_threshold_is_serial(inventory_rows, asset_data, pools):
+    serial = list(main.iter_compare(inventory_rows, asset_data, START_DATE, END_DATE))
+    result = list(main.iter_compare_parallel(
+        iter(inventory_rows), asset_data, START_DATE, END_DATE, workers=4, threshold=len(inventory_rows) + 1))
+    assert pools == []
+    assert result == serial
+
+def test_serial_while_other_threads_run(inventory_rows, asset_data, pools, caplog):
+    serial = list(main.iter_compare(inventory_rows, asset_data, START_DATE, END_DATE))
+    stop = threading.Event()
+    busy = threading.Thread(target=stop.wait, name="busy", daemon=True)
+    busy.start()
+    try:
+        result = list(main.iter_compare_parallel(
+            iter(inventory_rows), asset_data, START_DATE, END_DATE, workers=4, threshold=100))
+    finally:
+        stop.set()
+        busy.join()
+    assert pools == []
+    assert result == serial
+    assert "other threads are running (busy)" in caplog.text
@@ -0,0 +1,90 @@
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import openpyxl
+import pytest
+
+from conftest import START_DATE, END_DATE, SHEET_NAME
+from lib.util import Util
+from main import iter_compare
+
+def reconcile(
+        file_path: str,
+        asset_data: dict[str, dict[str, str]]
+        ) -> None:
+    """
+    main.pyと同じ手順で、棚卸リストを資産データと比較して上書きします。
+    """
+
+    inventory = Util.create_inventory(file_path, "utf-8-sig")
+    assert inventory.load(file_path, SHEET_NAME)
+    try:
+        assert inventory.is_worksheet_vaild()
+        inventory.overwrite(
+            iter_compare(inventory.iter_inventory_data(), asset_data, START_DATE, END_DATE), file_path)
+    finally:
+        inventory.close()
+
+def dump(
+        file_path: str
+        ) -> list:
+    """
+    比較用に、棚卸リストの値（Excelの場合はフォントの色も）を読み込みます。
+    """
+
+    if not file_path.endswith(".xlsx"):
+        with open(file_path, encoding="utf-8-sig") as f:
+            return f.read().splitlines()
+    worksheet = openpyxl.load_workbook(file_path)[SHEET_NAME]
+    return [[(cell.value, cell.font.color.rgb if cell.font.color else None) for cell in row]
+            for row in worksheet.iter_rows()]
+
+@pytest.mark.parametrize("extension", [".xlsx", ".csv"])
+def test_thread_pool_matches_serial(make_inventory, asset_data, extension):
+    source = make_inventory(f"source{extension}")
+    serial = source.replace("source", "serial")
+    shutil.copy(source, serial)
+    reconcile(serial, asset_data)
+    expected = dump(serial)
+    assert expected != dump(source)  # 差分があり、更新されていること
+
+    targets = [source.replace("source", f"parallel{i}") for i in range(16)]
+    for target in targets:
+        shutil.copy(source, target)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(reconcile, targets, [asset_data] * len(targets)))
+
+    for target in targets:
+        assert dump(target) == expected
+
+def test_shared_instance_reads_same_rows(make_inventory):
+    file_path = make_inventory("shared.xlsx")
+    inventory = Util.create_inventory(file_path, "utf-8-sig")
+    assert inventory.load(file_path, SHEET_NAME)
+    assert inventory.is_worksheet_vaild()
+    expected = inventory.load_inventory_data()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: inventory.load_inventory_data(), range(16)))
+
+    assert all(result == expected for result in results)
+    inventory.close()
+
+def test_paused_iteration_does_not_block_other_threads(make_inventory):
+    file_path = make_inventory("paused.xlsx", count=3000)
+    inventory = Util.create_inventory(file_path, "utf-8-sig")
+    assert inventory.load(file_path, SHEET_NAME)
+    assert inventory.is_worksheet_vaild()
+
+    rows = inventory.iter_inventory_data()
+    next(rows)  # 読み込みの途中で止めます。
+
+    thread = threading.Thread(target=inventory.update, args=({"3": {"備考": {"Before": "", "After": "x"}}},),
+                              daemon=True)  # ロックが解放されない場合でもテストを終了できるようにします。
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+
+    assert sum(1 for _ in rows) == 3000 - 1
+    inventory.close()
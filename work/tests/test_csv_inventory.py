@@ -0,0 +1,62 @@
+import codecs
+import os
+
+import pytest
+
+from lib.csv_inventory import CsvInventory
+from lib.inventory import InventorySource
+
+HEADER = list(InventorySource.COLUMN_NAMES.values())
+ROW = ["棚卸対象", "", "", "", "開発部", "M000001", "SN1", "", "佐藤", "9F", "a"]
+CHANGE = {"3": {"使用者": {"Before": "a", "After": "b"}}}
+
+def write_csv(
+        file_path: str,
+        rows: list[list[str]],
+        lineterminator: str,
+        bom: bool
+        ) -> None:
+    text = lineterminator.join(",".join(row) for row in rows) + lineterminator
+    with open(file_path, "wb") as f:
+        f.write((codecs.BOM_UTF8 if bom else b"") + text.encode("utf-8"))
+
+def update(
+        file_path: str
+        ) -> bytes:
+    inventory = CsvInventory()
+    assert inventory.load(file_path, None)
+    assert inventory.is_worksheet_vaild()
+    inventory.overwrite(CHANGE, file_path)
+    with open(file_path, "rb") as f:
+        return f.read()
+
+@pytest.mark.parametrize("lineterminator", ["\n", "\r\n"])
+@pytest.mark.parametrize("bom", [False, True])
+def test_save_keeps_line_terminator_and_bom(tmp_path, lineterminator, bom):
+    file_path = str(tmp_path / "inventory.csv")
+    write_csv(file_path, [["実棚リスト"], HEADER, ROW, ROW[:5] + ["M000002"] + ROW[6:]], lineterminator, bom)
+
+    expected = str(tmp_path / "expected.csv")
+    write_csv(expected, [["実棚リスト"], HEADER + ["変更"], ROW[:10] + ["b", "使用者"],
+                         ROW[:5] + ["M000002"] + ROW[6:]], lineterminator, bom)
+    with open(expected, "rb") as f:
+        assert update(file_path) == f.read()
+
+def test_save_keeps_columns_after_the_table(tmp_path):
+    file_path = str(tmp_path / "inventory.csv")
+    write_csv(file_path, [["実棚リスト"], HEADER + ["メモ"], ROW + ["keep-me"]], "\n", False)
+    assert update(file_path).decode("utf-8").splitlines()[1:] == [
+        ",".join(HEADER + ["メモ", "変更"]),
+        ",".join(ROW[:10] + ["b", "keep-me", "使用者"])
+    ]
+
+    # 既存の「変更」列は、追加せずにそのまま使用します。
+    write_csv(file_path, [["実棚リスト"], HEADER + ["変更", "メモ"], ROW + ["使用場所", "keep-me"]], "\n", False)
+    assert update(file_path).decode("utf-8").splitlines()[2] == ",".join(ROW[:10] + ["b", "使用場所、使用者", "keep-me"])
+
+def test_save_keeps_file_mode(tmp_path):
+    file_path = str(tmp_path / "inventory.csv")
+    write_csv(file_path, [["実棚リスト"], HEADER, ROW], "\n", False)
+    os.chmod(file_path, 0o664)
+    update(file_path)
+    assert os.stat(file_path).st_mode & 0o777 == 0o664
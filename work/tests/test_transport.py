@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from lib.transport import DeadlineExceeded, Transport, TransportPolicy
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    通信の失敗を再現するサーバーです。パスごとに応答の仕方を変えます。
+    """
+
+    protocol_version = "HTTP/1.1"
+    counts: Counter = Counter()  # パスごとのリクエスト数
+    lock = threading.Lock()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def __send_headers(
+            self,
+            status: int,
+            length: int
+            ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        with self.lock:
+            self.counts[self.path] += 1
+            count = self.counts[self.path]
+
+        if self.path == "/stall":  # ヘッダーと本文の一部を返した後、応答しなくなります。
+            self.__send_headers(200, 100)
+            self.wfile.write(b"x" * 10)
+            self.wfile.flush()
+            time.sleep(1.0)
+        elif self.path == "/reset":  # 本文の途中で接続を切ります。
+            self.__send_headers(200, 100)
+            self.wfile.write(b"x" * 10)
+            self.wfile.flush()
+            self.close_connection = True
+        elif self.path == "/unavailable":  # 2回目までは503を返します。
+            if count <= 2:
+                self.__send_headers(503, 0)
+            else:
+                self.__send_headers(200, 2)
+                self.wfile.write(b"ok")
+        elif self.path == "/trickle":  # 本文を少しずつ、読み込みタイムアウトより短い間隔で返し続けます。
+            self.__send_headers(200, 100)
+            for _ in range(100):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                time.sleep(0.05)
+        elif self.path == "/slow_first":  # 1回目のリクエストだけ応答が遅れます。
+            if count == 1:
+                time.sleep(1.0)
+            body = f"response {count}".encode()
+            self.__send_headers(200, len(body))
+            self.wfile.write(body)
+        else:
+            self.__send_headers(404, 0)
+
+@pytest.fixture
+def base_url():
+    StandInHandler.counts = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+def create_transport(**kwargs) -> Transport:
+    policy = TransportPolicy(**{"connect_timeout": 1.0, "read_timeout": 0.3, "retries": 2, "backoff": 0.01, **kwargs})
+    return Transport(requests.Session(), policy)
+
+def test_stalled_body_is_retried_as_timeout(base_url):
+    with pytest.raises(requests.Timeout):
+        create_transport().get(f"{base_url}/stall")
+    assert StandInHandler.counts["/stall"] == 3
+
+def test_connection_reset_in_body_is_retried(base_url):
+    with pytest.raises(requests.ConnectionError):
+        create_transport().get(f"{base_url}/reset")
+    assert StandInHandler.counts["/reset"] == 3
+
+def test_retry_status_codes(base_url):
+    res = create_transport().get(f"{base_url}/unavailable")
+    assert res.status_code == 200
+    assert res.text == "ok"
+    assert StandInHandler.counts["/unavailable"] == 3
+
+def test_deadline_while_reading_body(base_url):
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        create_transport(deadline=0.5).get(f"{base_url}/trickle")
+    assert time.monotonic() - started < 1.5
+
+def test_hedged_request_returns_faster_response(base_url):
+    started = time.monotonic()
+    res = create_transport(read_timeout=5.0, hedge_delay=0.2).get(f"{base_url}/slow_first", hedge=True)
+    assert time.monotonic() - started < 0.9
+    assert res.text == "response 2"
+    assert StandInHandler.counts["/slow_first"] == 2
+
+    # 遅れている方のリクエストは、次のチャンクを読んだ時点で中断されます。ログ出力を終えるまで待ちます。
+    for thread in threading.enumerate():
+        if thread.name.startswith("ThreadPoolExecutor"):
+            thread.join(timeout=5)